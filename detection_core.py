@@ -0,0 +1,493 @@
+"""Qt-free detection helpers shared by the desktop app (rec.py) and the headless CLI (headless.py)."""
+import os, sys
+import ast
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+# torch, torchvision and ultralytics take seconds to import; they are imported where first needed
+# so the app can show its splash screen (and the CLI parse its arguments) before paying for them.
+
+
+def env_int(name, default):
+    """Integer setting from the environment; a missing or malformed value falls back to default."""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Warning: ignoring {name}={value!r} (not an integer); using {default}.")
+        return default
+
+# --- Configuration ---
+MODEL_FILE = "best.pt"
+MODEL_BACKENDS = ("pytorch", "onnx")
+MODEL_BACKEND = os.environ.get("WASTE_DETECTION_BACKEND", "pytorch").lower()  # Startup switch for app and CLI
+ONNX_INTRA_OP_THREADS = max(0, env_int("WASTE_DETECTION_ONNX_THREADS", 0)) or os.cpu_count() or 1
+ONNX_INTER_OP_THREADS = 1  # One graph runs at a time (calls are serialised by the model lock)
+MODEL_VARIANTS = ("fp32", "fp16", "int8")
+MODEL_VARIANT = os.environ.get("WASTE_DETECTION_MODEL_VARIANT", "fp32").lower()  # fp16 needs CUDA; int8 runs on ONNX Runtime
+MODEL_WARMUP_SHAPES = ((480, 640), (720, 1280))  # Frame sizes (h, w) warmed up; each letterboxes to its own input
+MODEL_WARMUP_RUNS = max(0, env_int("WASTE_DETECTION_WARMUP_RUNS", 2))  # Passes per shape, 0 to skip warm-up
+CALIBRATION_MAX_IMAGES = 200  # Images fed through the model to pick INT8 activation ranges
+BATCH_INFERENCE_SIZE = 8  # Images per YOLO forward pass when processing a dropped/uploaded set
+IMAGE_DECODE_WORKERS = 4  # Threads decoding image files ahead of inference
+RAW_NMS_IOU = 1.0  # Image inference keeps every candidate box; IoU is applied afterwards by nms_indices()
+RAW_MAX_DETECTIONS = 1000  # Candidate boxes kept per image before our own NMS
+MAX_DETECTIONS = 300  # Detections kept after NMS, same as Ultralytics' default max_det
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+PLASTIC_CLASSES = ["PET", "HDPE", "PVC", "LDPE", "PP", "PS"]
+PLASTIC_BOX_COLORS = {  # BGR, for boxes drawn with OpenCV
+    "PET": (0, 255, 255),   # Yellow (B=0, G=255, R=255)
+    "HDPE": (0, 165, 255),  # Orange (B=0, G=165, R=255)
+    "LDPE": (0, 255, 0),    # Green  (B=0, G=255, R=0)
+    "PVC": (0, 0, 255),     # Red    (B=0, G=0, R=255)
+    "PP": (128, 128, 128),  # Gray   (B=128, G=128, R=128)
+    "PS": (128, 0, 128),    # Purple (B=128, G=0, R=128)
+}
+DEFAULT_BOX_COLOR = (200, 200, 200)
+DARK_TEXT_PLASTICS = ("PET", "HDPE", "LDPE")  # Light box colours that need black label text
+
+# --- Utility Functions ---
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller .exe """
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+def get_device():
+    """Determines the device to run the model on (CUDA or CPU)."""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def resolve_model_variant(variant=None, device=None, backend=None):
+    """Returns the (variant, backend) actually used: fp16 falls back to fp32 without CUDA, int8 needs ONNX Runtime."""
+    variant = (variant or MODEL_VARIANT).lower()
+    backend = (backend or MODEL_BACKEND).lower()
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Unknown model variant '{variant}', expected one of {', '.join(MODEL_VARIANTS)}")
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {', '.join(MODEL_BACKENDS)}")
+    if variant == "fp16" and not str(device or get_device()).startswith("cuda"):
+        print("Warning: FP16 inference needs a CUDA device; using FP32.")
+        variant = "fp32"
+    if variant == "int8" and backend != "onnx":
+        print("INT8 models run on ONNX Runtime; switching backend to onnx.")
+        backend = "onnx"
+    return variant, backend
+
+
+def load_model(model_path=None, device=None, backend=None, variant=None):
+    """Loads the detector onto the given (or best available) device.
+
+    backend "pytorch" loads the weights with Ultralytics; "onnx" (or a .onnx model_path) runs
+    an exported graph through ONNX Runtime, exporting it next to the .pt weights on first use.
+    variant "fp16" runs in half precision on CUDA; "int8" loads the calibrated model written by
+    `headless.py calibrate`, or quantizes the weights dynamically if there is none.
+    """
+    model_path = model_path or resource_path(MODEL_FILE)
+    device = device or get_device()
+    if model_path.lower().endswith(".onnx"):
+        return OnnxDetector(model_path, device)
+    variant, backend = resolve_model_variant(variant, device, backend)
+    if variant == "int8":
+        return OnnxDetector(quantized_model_path(model_path), device)
+    if backend == "onnx":
+        return OnnxDetector(export_onnx_model(model_path, half=variant == "fp16"), device)
+    from ultralytics import YOLO
+    model = YOLO(model_path).to(device)
+    if variant == "fp16":
+        model.overrides["half"] = True  # Picked up by every predict() call
+    return model
+
+
+def warm_up_model(model, shapes=MODEL_WARMUP_SHAPES, runs=MODEL_WARMUP_RUNS):
+    """Runs throwaway inferences so lazy initialisation, kernel selection and allocations happen
+    before the first real image. Returns the duration of each pass in seconds."""
+    timings = []
+    for height, width in shapes:
+        image = np.full((height, width, 3), 114, dtype=np.uint8)
+        for _ in range(runs):
+            start_time = time.time()
+            model(image, conf=0.01, iou=RAW_NMS_IOU, max_det=RAW_MAX_DETECTIONS, verbose=False)
+            timings.append(time.time() - start_time)
+    return timings
+
+
+def absolute_image_path(path):
+    """Absolute form of an image path, leaving already-absolute paths untouched (history is keyed on it)."""
+    return os.path.abspath(path) if not os.path.isabs(path) else path
+
+
+# One row per detection; box is xyxy in pixels
+DETECTION_DTYPE = np.dtype([("box", np.float32, (4,)), ("conf", np.float32), ("cls", np.int16)])
+
+
+def extract_detections(result):
+    """Converts one Ultralytics result into a DETECTION_DTYPE array with a single device-to-host copy."""
+    if result is None or result.boxes is None or len(result.boxes) == 0:
+        return np.empty(0, dtype=DETECTION_DTYPE)
+    data = result.boxes.data[:, :6].detach().cpu().numpy()  # x1, y1, x2, y2, conf, cls
+    detections = np.empty(len(data), dtype=DETECTION_DTYPE)
+    detections["box"] = data[:, :4]
+    detections["conf"] = data[:, 4]
+    detections["cls"] = data[:, 5]
+    return detections
+
+
+def xyxy_to_xywh(boxes):
+    """Corner boxes to centre/size boxes, as StrongSORT expects."""
+    xywh = np.empty_like(boxes)
+    xywh[:, :2] = (boxes[:, :2] + boxes[:, 2:]) / 2
+    xywh[:, 2:] = boxes[:, 2:] - boxes[:, :2]
+    return xywh
+
+
+def nms_indices(detections, iou_threshold, max_det=MAX_DETECTIONS):
+    """Class-aware NMS over raw detections, matching Ultralytics; returns kept indices, best score first."""
+    if len(detections) == 0:
+        return np.empty(0, dtype=np.int64)
+    # Shift each class into its own coordinate range so boxes of different classes never overlap
+    shifted = detections["box"] + detections["cls"].astype(np.float32)[:, None] * 7680.0
+    import torch, torchvision
+    scores = np.ascontiguousarray(detections["conf"])  # Field views are strided; torch needs a packed array
+    keep = torchvision.ops.nms(torch.from_numpy(shifted), torch.from_numpy(scores), iou_threshold)
+    return keep[:max_det].numpy()
+
+
+def detections_to_dicts(detections, names):
+    """Builds the detection dicts stored in history from a DETECTION_DTYPE array."""
+    boxes = detections["box"].astype(np.int32).tolist()
+    confs = np.round(detections["conf"].astype(np.float64), 4).tolist()
+    return [{
+        "class": names.get(cls_id, f"Class_{cls_id}"),
+        "class_id": cls_id,
+        "conf": conf,
+        "box": box
+    } for box, conf, cls_id in zip(boxes, confs, detections["cls"].tolist())]
+
+# --- Plastic Class Resolution ---
+
+
+class PlasticClassResolver:
+    """Maps model class ids to the canonical plastic label, box colour and font colour.
+
+    Built once per model/plastic class list, so drawing and counting index
+    lists by class id instead of substring-matching every detection. Class
+    names that are not model classes (e.g. from history) are resolved once
+    and memoised.
+    """
+
+    def __init__(self, names, plastic_classes):
+        self.plastic_classes = list(plastic_classes)
+        self._model_names = {name.lower(): name for name in names.values()}
+        self._by_name = {}
+        num_ids = max(names) + 1 if names else 0
+        resolved = [self.resolve_name(names.get(i, f"Class_{i}")) for i in range(num_ids)]
+        self.labels = [r[0] for r in resolved]
+        self.plastics = [r[1] for r in resolved]  # Matched plastic class, or None
+        self.colors = [r[2] for r in resolved]
+        self.font_colors = [r[3] for r in resolved]
+
+    def resolve_name(self, class_name):
+        """Returns (label, plastic or None, box colour, font colour) for a class name."""
+        resolved = self._by_name.get(class_name)
+        if resolved is None:
+            class_name_lower = class_name.lower()
+            # Match standard abbreviations
+            plastic = next((target for target in self.plastic_classes
+                            if target.lower() in class_name_lower), None)
+            label = plastic or class_name
+            color = PLASTIC_BOX_COLORS.get(plastic, DEFAULT_BOX_COLOR) if plastic else DEFAULT_BOX_COLOR
+            font_color = (0, 0, 0) if label in DARK_TEXT_PLASTICS else (255, 255, 255)
+            resolved = self._by_name[class_name] = (label, plastic, color, font_color)
+        return resolved
+
+    def resolve(self, detection):
+        """Resolves a detection dict, by its class id when it carries one."""
+        class_id = detection.get('class_id')
+        if class_id is not None and 0 <= class_id < len(self.labels):
+            return self.labels[class_id], self.plastics[class_id], self.colors[class_id], self.font_colors[class_id]
+        return self.resolve_name(detection['class'])
+
+    def analytics_label(self, class_name):
+        """Label a stored class name is counted under in analytics (model names are kept as-is)."""
+        if not class_name:
+            return 'Unknown'
+        return self._model_names.get(class_name.lower()) or self.resolve_name(class_name)[0]
+
+# --- ONNX Runtime Backend ---
+
+
+def is_up_to_date(derived_path, source_path):
+    return os.path.exists(derived_path) and os.path.getmtime(derived_path) >= os.path.getmtime(source_path)
+
+
+def export_onnx_model(model_path, half=False):
+    """Returns the .onnx file for a .pt model, exporting it when missing or older than the weights."""
+    if model_path.lower().endswith(".onnx"):
+        return model_path
+    onnx_path = os.path.splitext(model_path)[0] + (".fp16.onnx" if half else ".onnx")
+    if not is_up_to_date(onnx_path, model_path):
+        from ultralytics import YOLO
+        print(f"Exporting {model_path} to {'FP16 ' if half else ''}ONNX...")
+        # Dynamic axes allow batches and the same minimal letterbox padding the PyTorch path uses
+        exported = YOLO(model_path).export(format="onnx", dynamic=True, half=half, device=0 if half else None)
+        if os.path.abspath(exported) != os.path.abspath(onnx_path):
+            os.replace(exported, onnx_path)
+    return onnx_path
+
+
+def quantized_model_path(model_path):
+    """Returns the INT8 model for a .pt model: the calibrated one if current, else a dynamically quantized one."""
+    base = os.path.splitext(model_path)[0]
+    static_path = base + ".int8.onnx"
+    if is_up_to_date(static_path, model_path):
+        return static_path
+    dynamic_path = base + ".int8-dynamic.onnx"
+    if not is_up_to_date(dynamic_path, model_path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        print(f"No calibrated INT8 model at {static_path}; quantizing weights dynamically "
+              f"(run `headless.py calibrate` for better accuracy)...")
+        # ConvInteger on CPU takes unsigned 8-bit weights
+        quantize_dynamic(export_onnx_model(model_path), dynamic_path, weight_type=QuantType.QUInt8)
+    return dynamic_path
+
+
+def quantize_model_static(model_path, image_paths, output_path=None, max_images=CALIBRATION_MAX_IMAGES):
+    """Writes a statically quantized (QDQ, per-channel) INT8 model calibrated on the given images.
+
+    Everything but the detect head's box decoding is quantized; the DFL and the decoding arithmetic
+    stay in float, since box coordinates are the most sensitive to 8-bit rounding.
+    """
+    import onnx
+    from onnxruntime.quantization import quantize_static, quant_pre_process, QuantFormat, QuantType
+
+    onnx_path = export_onnx_model(model_path)
+    output_path = output_path or os.path.splitext(model_path)[0] + ".int8.onnx"
+    prepared_path = os.path.splitext(output_path)[0] + ".prep.onnx"
+    try:
+        # Symbolic shape inference cannot resolve the dynamic axes; ONNX shape inference is enough here
+        quant_pre_process(onnx_path, prepared_path, skip_symbolic_shape=True)
+    except Exception as e:
+        print(f"Quantization pre-processing skipped: {e}")
+        prepared_path = onnx_path
+    try:
+        graph = onnx.load(prepared_path).graph
+        # Ultralytics names nodes after modules, e.g. "/model.22/dfl/conv/Conv"; the head is "/model.22/"
+        dfl_node = next((node.name for node in graph.node if "/dfl/" in node.name.lower()), None)
+        head_prefix = dfl_node[:dfl_node.lower().index("dfl/")] if dfl_node else None
+        decode_nodes = [node.name for node in graph.node if head_prefix and node.name.startswith(head_prefix)
+                        and (node.op_type != "Conv" or "/dfl/" in node.name.lower())]
+        reader = ImageCalibrationReader(image_paths[:max_images], graph.input[0].name)
+        quantize_static(prepared_path, output_path, reader, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True,
+                        nodes_to_exclude=decode_nodes)
+    finally:
+        if prepared_path != onnx_path and os.path.exists(prepared_path):
+            os.remove(prepared_path)
+    return output_path
+
+
+def letterbox(image, imgsz, stride=32, auto=False):
+    """Resizes and pads like Ultralytics' LetterBox (auto: pad only up to a multiple of stride)."""
+    shape = image.shape[:2]
+    r = min(imgsz[0] / shape[0], imgsz[1] / shape[1])
+    new_unpad = round(shape[1] * r), round(shape[0] * r)
+    dw, dh = imgsz[1] - new_unpad[0], imgsz[0] - new_unpad[1]
+    if auto:  # Minimum rectangle that is a multiple of the stride
+        dw, dh = dw % stride, dh % stride
+    dw, dh = dw / 2, dh / 2
+    if shape[::-1] != new_unpad:
+        image = cv2.resize(image, new_unpad, interpolation=cv2.INTER_LINEAR)
+    return cv2.copyMakeBorder(image, round(dh - 0.1), round(dh + 0.1), round(dw - 0.1), round(dw + 0.1),
+                              cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+
+def to_input_tensor(images, dtype=np.float32):
+    """Letterboxed BGR HWC images -> normalised RGB NCHW batch."""
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=dtype) / dtype(255)
+
+
+class ImageCalibrationReader:
+    """Feeds letterboxed images one at a time to ONNX Runtime's static quantization calibrator."""
+
+    def __init__(self, image_paths, input_name, imgsz=(640, 640)):
+        self.image_paths = iter(image_paths)
+        self.input_name = input_name
+        self.imgsz = imgsz
+
+    def get_next(self):
+        for path in self.image_paths:
+            image = cv2.imread(path)
+            if image is None:
+                print(f"Calibration: skipping unreadable image {path}")
+                continue
+            return {self.input_name: to_input_tensor([letterbox(image, self.imgsz)])}
+        return None
+
+
+class OnnxBoxes:
+    """Minimal stand-in for Ultralytics' Boxes: data is an Nx6 [x1, y1, x2, y2, conf, cls] tensor."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+
+class OnnxResult:
+    def __init__(self, boxes, orig_shape, names):
+        self.boxes = boxes
+        self.orig_shape = orig_shape
+        self.names = names
+
+
+class OnnxDetector:
+    """YOLO detector running an exported ONNX graph in a tuned, reused ONNX Runtime session.
+
+    Called like an Ultralytics model (model(images, conf=, iou=, max_det=) or model.predict(...))
+    with the same letterboxing, confidence filter and class-aware NMS, returning one result per
+    image whose boxes.data feeds extract_detections() unchanged.
+    """
+
+    def __init__(self, onnx_path, device="cpu"):
+        import onnxruntime as ort  # Only needed when this backend is selected
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+        options.inter_op_num_threads = ONNX_INTER_OP_THREADS
+        providers = ["CPUExecutionProvider"]
+        if str(device).startswith("cuda") and "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        self.device = device
+        self.onnx_path = onnx_path
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if "float16" in model_input.type else np.float32
+        self.dynamic = not all(isinstance(dim, int) for dim in model_input.shape[2:])
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+        self.stride = int(metadata.get("stride", 32))
+        if self.dynamic:
+            imgsz = ast.literal_eval(metadata.get("imgsz", "[640, 640]"))
+            self.imgsz = tuple(imgsz) if isinstance(imgsz, (list, tuple)) else (imgsz, imgsz)
+        else:
+            self.imgsz = tuple(model_input.shape[2:])
+
+    def __call__(self, source, conf=0.25, iou=0.7, max_det=MAX_DETECTIONS, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        if not images:
+            return []
+        auto = self.dynamic and len({image.shape for image in images}) == 1
+        padded = [letterbox(image, self.imgsz, self.stride, auto) for image in images]
+        batch = to_input_tensor(padded, self.input_dtype)
+
+        if self.dynamic:
+            outputs = self.session.run(None, {self.input_name: batch})[0]
+        else:  # Fixed batch dimension of 1
+            outputs = np.concatenate([self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                                      for i in range(len(batch))])
+        import torch
+        outputs = torch.from_numpy(outputs.astype(np.float32, copy=False))
+
+        input_shape = padded[0].shape[:2]
+        return [OnnxResult(OnnxBoxes(self.postprocess(prediction, input_shape, image.shape[:2], conf, iou, max_det)),
+                           image.shape[:2], self.names)
+                for prediction, image in zip(outputs, images)]
+
+    predict = __call__
+
+    @staticmethod
+    def postprocess(prediction, input_shape, image_shape, conf, iou, max_det):
+        """(4 + classes, anchors) raw output -> Nx6 detections in original image pixels, as Ultralytics' NMS."""
+        import torch, torchvision
+        prediction = prediction.T
+        scores, classes = prediction[:, 4:].max(1)
+        keep = scores > conf
+        boxes, scores, classes = prediction[keep, :4], scores[keep], classes[keep]
+        if len(scores) > 30000:  # Ultralytics' max_nms
+            top = scores.argsort(descending=True)[:30000]
+            boxes, scores, classes = boxes[top], scores[top], classes[top]
+
+        xyxy = torch.empty_like(boxes)
+        xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+        xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+        offsets = classes.unsqueeze(1).float() * 7680  # Class-aware NMS, Ultralytics' max_wh offset
+        keep = torchvision.ops.nms(xyxy + offsets, scores, iou)[:max_det]
+        xyxy, scores, classes = xyxy[keep], scores[keep], classes[keep]
+
+        # Undo the letterbox
+        gain = min(input_shape[0] / image_shape[0], input_shape[1] / image_shape[1])
+        new_h, new_w = round(image_shape[0] * gain), round(image_shape[1] * gain)
+        pad_x = round((input_shape[1] - new_w) / 2 - 0.1)
+        pad_y = round((input_shape[0] - new_h) / 2 - 0.1)
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / (new_w / image_shape[1])).clamp(0, image_shape[1])
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / (new_h / image_shape[0])).clamp(0, image_shape[0])
+        return torch.cat([xyxy, scores.unsqueeze(1), classes.unsqueeze(1).float()], 1)
+
+# --- Batch Image Inference ---
+
+
+def iter_decoded_batches(paths, batch_size=BATCH_INFERENCE_SIZE, decode_workers=IMAGE_DECODE_WORKERS):
+    """Yields (batch_paths, images) for consecutive batches, decoding the next batch while one is in use.
+
+    Images that cannot be read are None. Closing the generator cancels any pending decodes.
+    """
+    batch_size = max(1, batch_size)
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, decode_workers)) as pool:
+        pending = [pool.submit(cv2.imread, path) for path in batches[0]] if batches else []
+        try:
+            for index, batch_paths in enumerate(batches):
+                images = [future.result() for future in pending]
+                if index + 1 < len(batches):
+                    pending = [pool.submit(cv2.imread, path) for path in batches[index + 1]]
+                yield batch_paths, images
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def infer_image_batch(model, model_lock, paths, images, iou_threshold):
+    """Runs one forward pass over decoded images; returns partial history records for the readable ones."""
+    valid = [(path, img) for path, img in zip(paths, images) if img is not None]
+    for path, img in zip(paths, images):
+        if img is None:
+            print(f"Batch inference: could not read {path}")
+    if not valid:
+        return []
+
+    start_time = time.time()
+    with model_lock:
+        # Set conf to 0.01 to get ALL detections, same as the single-image path
+        results = model([img for _, img in valid], conf=0.01, iou=RAW_NMS_IOU,
+                        max_det=RAW_MAX_DETECTIONS, verbose=False)
+    per_image_ms = (time.time() - start_time) * 1000 / len(valid)
+
+    records = []
+    for (path, _), result in zip(valid, results):
+        raw = extract_detections(result)
+        records.append({
+            "image_path": path,
+            "processing_time_ms": per_image_ms,
+            "iou_threshold": iou_threshold,
+            "raw": raw,
+            "detections": raw[nms_indices(raw, iou_threshold)],
+        })
+    return records
@@ -0,0 +1,300 @@
+"""Headless batch detection: runs the plastic detector over image files without the Qt GUI.
+
+Examples:
+    python headless.py archive/2024-05 -o detections.csv
+    python headless.py "archive/**/*.jpg" -o detections.jsonl --batch-size 16 --workers 8
+    python headless.py calibrate dataset/images -r   # writes best.int8.onnx for --variant int8
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from detection_core import (
+    load_model, absolute_image_path, iter_decoded_batches, infer_image_batch, PlasticClassResolver,
+    extract_detections, quantize_model_static, resource_path, OnnxDetector,
+    DETECTION_DTYPE, BATCH_INFERENCE_SIZE, IMAGE_DECODE_WORKERS, IMAGE_EXTENSIONS, PLASTIC_CLASSES,
+    MODEL_BACKENDS, MODEL_BACKEND, MODEL_VARIANTS, MODEL_VARIANT, MODEL_FILE, CALIBRATION_MAX_IMAGES,
+    warm_up_model
+)
+
+CSV_FIELDS = [
+    "image_path", "object_id", "class_id", "class_name", "plastic", "confidence",
+    "x1", "y1", "x2", "y2", "processing_time_ms"
+]
+
+
+def collect_image_paths(inputs, recursive=False):
+    """Expands files, directories and glob patterns into a de-duplicated list of image paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                found = [os.path.join(root, name) for root, _, names in os.walk(item) for name in names]
+            else:
+                found = [os.path.join(item, name) for name in os.listdir(item)]
+            found = sorted(p for p in found if p.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(p))
+        elif os.path.isfile(item):
+            found = [item]
+        else:
+            found = sorted(p for p in glob.glob(item, recursive=True)
+                           if p.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(p))
+            if not found:
+                print(f"Warning: no images match '{item}'", file=sys.stderr)
+        paths.extend(absolute_image_path(p) for p in found)
+    return list(dict.fromkeys(paths))
+
+
+class DetectionWriter:
+    """Writes per-image results as CSV (one row per detection) or JSONL (one line per image)."""
+
+    def __init__(self, stream, output_format, names, resolver):
+        self.stream = stream
+        self.output_format = output_format
+        self.names = names
+        self.resolver = resolver
+        if output_format == "csv":
+            self.csv_writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, image_path, detections, processing_time_ms, error=None):
+        rows = [{
+            "object_id": i + 1,
+            "class_id": class_id,
+            "class_name": self.names.get(class_id, f"Class_{class_id}"),
+            "plastic": self.resolver.plastics[class_id] if class_id < len(self.resolver.plastics) else None,
+            "confidence": round(conf, 4),
+            "box": box,
+        } for i, (box, conf, class_id) in enumerate(zip(
+            detections["box"].astype(int).tolist(), detections["conf"].tolist(), detections["cls"].tolist()))]
+
+        if self.output_format == "jsonl":
+            line = {"image_path": image_path, "processing_time_ms": round(processing_time_ms, 2), "detections": rows}
+            if error:
+                line["error"] = error
+            self.stream.write(json.dumps(line) + "\n")
+            return
+        for row in rows:
+            x1, y1, x2, y2 = row.pop("box")
+            row.update(image_path=image_path, x1=x1, y1=y1, x2=x2, y2=y2,
+                       processing_time_ms=f"{processing_time_ms:.2f}", plastic=row["plastic"] or "")
+            self.csv_writer.writerow(row)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Detect plastics in image files without starting the GUI. CSV output has one row per "
+                    "detection; JSONL output has one line per image, including images with no detections.")
+    parser.add_argument("inputs", nargs="+", help="Image files, directories or glob patterns (quote globs)")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="Output format (default: from the output extension, else csv)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Descend into sub-directories")
+    parser.add_argument("--model", help="YOLO weights (default: the bundled best.pt)")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS, default=MODEL_BACKEND,
+                        help=f"Inference backend; onnx exports the weights on first use (default: {MODEL_BACKEND}, "
+                             "set with WASTE_DETECTION_BACKEND)")
+    parser.add_argument("--variant", choices=MODEL_VARIANTS, default=MODEL_VARIANT,
+                        help=f"Model precision; fp16 needs CUDA, int8 runs on ONNX Runtime (default: {MODEL_VARIANT}, "
+                             "set with WASTE_DETECTION_MODEL_VARIANT)")
+    parser.add_argument("--device", help="Inference device, e.g. cpu, cuda, cuda:1 (default: best available)")
+    parser.add_argument("--conf", type=float, default=0.50, help="Confidence threshold (default: 0.50)")
+    parser.add_argument("--iou", type=float, default=0.50, help="NMS IoU threshold (default: 0.50)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_INFERENCE_SIZE,
+                        help=f"Images per forward pass (default: {BATCH_INFERENCE_SIZE})")
+    parser.add_argument("--workers", type=int, default=IMAGE_DECODE_WORKERS,
+                        help=f"Image decoding threads (default: {IMAGE_DECODE_WORKERS})")
+    return parser
+
+
+def run(args):
+    paths = collect_image_paths(args.inputs, args.recursive)
+    if not paths:
+        print("No images found.", file=sys.stderr)
+        return 1
+
+    output_format = args.format or ("jsonl" if args.output.lower().endswith((".jsonl", ".json")) else "csv")
+    print(f"Loading model ({args.backend}, {args.variant}){' on ' + args.device if args.device else ''}...",
+          file=sys.stderr)
+    model = load_model(args.model, args.device, args.backend, args.variant)
+    warmup_times = warm_up_model(model)
+    if warmup_times:
+        print(f"Warm-up: {len(warmup_times)} passes in {sum(warmup_times):.2f}s "
+              f"(first {warmup_times[0] * 1000:.0f} ms, last {warmup_times[-1] * 1000:.0f} ms)", file=sys.stderr)
+    names = model.names
+    resolver = PlasticClassResolver(names, PLASTIC_CLASSES)
+    model_lock = threading.Lock()
+
+    stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    writer = DetectionWriter(stream, output_format, names, resolver)
+    total, done, num_detections, failed = len(paths), 0, 0, 0
+    start_time = time.time()
+    try:
+        for batch_paths, images in iter_decoded_batches(paths, args.batch_size, args.workers):
+            records = {record["image_path"]: record for record in
+                       infer_image_batch(model, model_lock, batch_paths, images, args.iou)}
+            for path in batch_paths:
+                record = records.get(path)
+                if record is None:
+                    failed += 1
+                    if output_format == "jsonl":
+                        writer.write(path, np.empty(0, dtype=DETECTION_DTYPE), 0.0, error="unreadable image")
+                    continue
+                detections = record["detections"]
+                detections = detections[detections["conf"] >= args.conf]
+                num_detections += len(detections)
+                writer.write(path, detections, record["processing_time_ms"])
+            done += len(batch_paths)
+            elapsed = time.time() - start_time
+            print(f"{done}/{total} images ({done / max(elapsed, 1e-9):.1f} img/s)", file=sys.stderr)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+    print(f"Done: {total - failed} images, {num_detections} detections, {failed} unreadable, "
+          f"{time.time() - start_time:.1f}s", file=sys.stderr)
+    return 0
+
+
+# --- INT8 Calibration ---
+
+
+def find_label_file(image_path):
+    """YOLO-format label for an image: the labels/ twin of an images/ folder, else a .txt beside it."""
+    stem = os.path.splitext(image_path)[0]
+    marker = os.sep + "images" + os.sep
+    if marker in stem:
+        head, tail = stem.rsplit(marker, 1)
+        candidate = head + os.sep + "labels" + os.sep + tail + ".txt"
+        if os.path.isfile(candidate):
+            return candidate
+    return stem + ".txt" if os.path.isfile(stem + ".txt") else None
+
+
+def load_yolo_labels(label_path, image_shape):
+    """Reads "class cx cy w h" (normalised) rows as (class ids, xyxy pixel boxes)."""
+    rows = np.loadtxt(label_path, ndmin=2, usecols=range(5)) if os.path.getsize(label_path) else np.empty((0, 5))
+    h, w = image_shape[:2]
+    cx, cy, bw, bh = rows[:, 1] * w, rows[:, 2] * h, rows[:, 3] * w, rows[:, 4] * h
+    boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+    return rows[:, 0].astype(int), boxes.astype(np.float32)
+
+
+def count_matches(detections, target_classes, target_boxes, iou_threshold=0.5):
+    """Greedy, confidence-ordered one-to-one matching of same-class boxes at the given IoU."""
+    if not len(detections) or not len(target_boxes):
+        return 0
+    import torch, torchvision  # Imported here so --help and argument errors stay fast
+
+    ious = torchvision.ops.box_iou(torch.from_numpy(np.ascontiguousarray(detections["box"])),
+                                   torch.from_numpy(target_boxes)).numpy()
+    ious[detections["cls"][:, None] != target_classes[None, :]] = 0
+    matched = 0
+    for row in np.argsort(-detections["conf"]):
+        col = int(ious[row].argmax())
+        if ious[row, col] >= iou_threshold:
+            matched += 1
+            ious[:, col] = 0
+    return matched
+
+
+def evaluate_models(models, paths, conf):
+    """Per-model ms/image plus precision/recall against labels (or agreement with the first model)."""
+    images = [(path, cv2.imread(path)) for path in paths]
+    images = [(path, image) for path, image in images if image is not None]
+    labels = {path: load_yolo_labels(find_label_file(path), image.shape)
+              for path, image in images if find_label_file(path)}
+    use_labels = len(labels) == len(images)
+
+    stats = {}
+    if not images:
+        print("No readable held-out images; skipping the model comparison.", file=sys.stderr)
+        return stats, use_labels
+    reference = {}
+    for name, model in models.items():
+        model(images[0][1], conf=conf, verbose=False)  # Warm-up, not timed
+        found = matched = expected = 0
+        elapsed = 0.0
+        for path, image in images:
+            start = time.time()
+            detections = extract_detections(model(image, conf=conf, verbose=False)[0])
+            elapsed += time.time() - start
+            if use_labels:
+                target_classes, target_boxes = labels[path]
+            elif path in reference:
+                target_classes, target_boxes = reference[path]["cls"].astype(int), reference[path]["box"]
+            else:
+                reference[path] = detections
+                target_classes, target_boxes = detections["cls"].astype(int), detections["box"]
+            found += len(detections)
+            expected += len(target_boxes)
+            matched += count_matches(detections, target_classes, target_boxes)
+        stats[name] = {"ms_per_image": elapsed / max(len(images), 1) * 1000,
+                       "precision": matched / found if found else 1.0,
+                       "recall": matched / expected if expected else 1.0}
+    return stats, use_labels
+
+
+def build_calibration_parser():
+    parser = argparse.ArgumentParser(
+        prog="headless.py calibrate",
+        description="Build a statically quantized INT8 model from your own images, then compare its speed and "
+                    "accuracy with FP32. Images with YOLO label files (labels/ next to images/, or a .txt "
+                    "beside each image) are scored against the labels; otherwise against FP32's detections.")
+    parser.add_argument("inputs", nargs="+", help="Calibration images: files, directories or glob patterns")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Descend into sub-directories")
+    parser.add_argument("--model", help="YOLO weights to quantize (default: the bundled best.pt)")
+    parser.add_argument("-o", "--output", help="INT8 model path (default: <weights>.int8.onnx, loaded by --variant int8)")
+    parser.add_argument("--max-images", type=int, default=CALIBRATION_MAX_IMAGES,
+                        help=f"Images used to calibrate activation ranges (default: {CALIBRATION_MAX_IMAGES})")
+    parser.add_argument("--eval-images", type=int, default=50,
+                        help="Held-out images for the FP32 vs INT8 comparison, 0 to skip (default: 50)")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold for the comparison (default: 0.25)")
+    return parser
+
+
+def run_calibration(args):
+    paths = collect_image_paths(args.inputs, args.recursive)
+    if not paths:
+        print("No images found.", file=sys.stderr)
+        return 1
+    model_path = args.model or resource_path(MODEL_FILE)
+    random.Random(0).shuffle(paths)
+    # Keep evaluation images out of calibration when there are enough of them
+    eval_count = min(args.eval_images, len(paths) // 2) if len(paths) > 1 else 0
+    eval_paths, calibration_paths = paths[:eval_count], paths[eval_count:]
+
+    print(f"Calibrating on {min(len(calibration_paths), args.max_images)} images...", file=sys.stderr)
+    start_time = time.time()
+    output_path = quantize_model_static(model_path, calibration_paths, args.output, args.max_images)
+    print(f"Wrote {output_path} ({time.time() - start_time:.1f}s)", file=sys.stderr)
+
+    if eval_paths:
+        models = {"fp32": load_model(model_path, "cpu", "onnx", "fp32"), "int8": OnnxDetector(output_path, "cpu")}
+        stats, use_labels = evaluate_models(models, eval_paths, args.conf)
+        if stats:
+            against = "labels" if use_labels else "FP32 detections"
+            print(f"Comparison on {len(eval_paths)} held-out images (scored against {against}):", file=sys.stderr)
+            for name, row in stats.items():
+                print(f"  {name}: {row['ms_per_image']:.1f} ms/image, precision {row['precision']:.3f}, "
+                      f"recall {row['recall']:.3f}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "calibrate":
+        return run_calibration(build_calibration_parser().parse_args(argv[1:]))
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,57 +1,105 @@
 import os, sys
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller .exe """
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
-
+import time
+LAUNCH_TIME = time.time()  # Import-time budget is measured from here to the splash screen
 import cv2
 import numpy as np
-import torch
-from ultralytics import YOLO
+from detection_core import (
+    resource_path, get_device, load_model, absolute_image_path, DETECTION_DTYPE, extract_detections,
+    xyxy_to_xywh, nms_indices, detections_to_dicts, PlasticClassResolver, iter_decoded_batches, infer_image_batch,
+    MODEL_FILE, BATCH_INFERENCE_SIZE, IMAGE_DECODE_WORKERS, RAW_NMS_IOU, RAW_MAX_DETECTIONS, IMAGE_EXTENSIONS,
+    PLASTIC_CLASSES, MODEL_BACKEND, MODEL_VARIANT, resolve_model_variant, warm_up_model
+)
 from PyQt6.QtCore import (
     QTimer, QThread, pyqtSignal, Qt, QSize, QRect, QRectF, QPropertyAnimation,
-    QEasingCurve, QPoint, QStandardPaths, QDateTime, QDate, Qt, QUrl, QTimer 
+    QEasingCurve, QPoint, QStandardPaths, QDateTime, QDate, Qt, QUrl, QTimer, QObject,
+    QRunnable, QThreadPool, QAbstractListModel, QModelIndex, QEvent
 )
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLayout, QPushButton,
     QFileDialog, QSlider, QFrame, QSpacerItem, QSizePolicy, QComboBox, QToolButton,
     QScrollArea, QGridLayout, QListWidget, QStackedLayout, QGraphicsOpacityEffect,
     QSplashScreen, QButtonGroup, QProgressBar, QStyle, QMessageBox, QTextBrowser,
-    QLineEdit, QDateEdit, QMainWindow
+    QLineEdit, QDateEdit, QMainWindow, QListView, QStyledItemDelegate
 )
 from PyQt6.QtGui import (
-    QPixmap, QFont, QImage, QColor, QPainter, QBrush, QPen, QFontDatabase, QIcon, QTextOption, QScreen, QShortcut, QKeySequence, QDoubleValidator
+    QPixmap, QFont, QImage, QColor, QPainter, QBrush, QPen, QFontDatabase, QIcon, QTextOption, QScreen, QShortcut, QKeySequence, QDoubleValidator,
+    QImageReader
 )
-
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PyQt6.QtMultimediaWidgets import QVideoWidget
-import time
 import os
 import csv
+import hashlib
+import importlib
 import json
+import math
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, date
-from collections import defaultdict, Counter
-
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from Yolov7_StrongSORT_OSNet.strong_sort.strong_sort import StrongSORT
+from collections import defaultdict, Counter, deque, OrderedDict
+# torch/ultralytics (via detection_core), StrongSORT, matplotlib and QtMultimedia are imported
+# lazily: in the loader threads, on first use, or by ModulePreloadThread while the splash is up.
 
 
 # --- Configuration ---
 APP_FONT_FAMILY = "Arial"
 ICON_DIR = resource_path("icons/")
-HISTORY_ITEMS_PER_PAGE = 16
+HISTORY_FETCH_SIZE = 64  # Records read from the history store each time the gallery scrolls to its end
+WEBCAM_FRAME_BUFFER_SIZE = 2  # Captured frames waiting for inference; oldest dropped when full
+VIDEO_FRAME_BUFFER_SIZE = 8  # Decoded video frames queued ahead of the tracker
+VIDEO_DISPLAY_MAX_FPS = 30  # Unpaced video analysis redraws the view at most this often
+MOSAIC_TILE_WIDTH = 640  # Width of each camera's tile when several cameras are tracked at once
+PREFETCH_AHEAD = 3  # Images after the current one to decode/detect in the background
+PREFETCH_BEHIND = 1  # Images before the current one to decode/detect in the background
+RESULT_CACHE_SIZE = 5000  # Per-image detection results kept for instant revisits (LRU)
+CAMERA_PROBE_INDICES = 5  # Camera indices probed when the OS cannot list its video devices
+CAMERA_PROBE_TIMEOUT = 3.0  # Seconds before an unresponsive camera probe is treated as absent
+CAMERA_CACHE_FILE = "camera_cache.json"  # Last discovered cameras, shown while a new probe runs
+SPLASH_TIME_BUDGET = 1.5  # Seconds from launch to splash screen before a startup warning is printed
+HEAVY_MODULES = ("torch", "torchvision", "ultralytics", "matplotlib", "onnxruntime")  # Must not load before the splash
+PRELOAD_MODULES = ("matplotlib.figure", "matplotlib.backends.backend_qtagg")  # Imported in the background at startup
+HISTORY_DB_FILE = "detection_history.db"  # Detection history kept between sessions (in the user data folder)
+HISTORY_WRITE_BUFFER_SIZE = 10000  # Records waiting for the database writer; oldest dropped when full
+HISTORY_WRITE_BATCH_SIZE = 500  # Records written per transaction at most
+HISTORY_WRITE_INTERVAL = 1.0  # Seconds a record may wait before a partial batch is committed
+HISTORY_FLUSH_TIMEOUT = 0.5  # Seconds the History tab waits for queued records to be committed before querying
+THUMBNAIL_SIZE = 160  # Gallery thumbnail box in pixels
+THUMBNAIL_CACHE_DIR = "thumbnails"  # Generated thumbnails kept between sessions (in the user data folder)
+THUMBNAIL_MEMORY_CACHE_SIZE = 512  # Thumbnails kept in memory for instant paging (LRU)
+THUMBNAIL_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Thumbnail files kept on disk; least recently used removed at startup
+THUMBNAIL_WORKERS = max(1, (os.cpu_count() or 2) // 2)  # Pool threads decoding thumbnails
+STRONGSORT_WEIGHTS = "Yolov7_StrongSORT_OSNet/strong_sort/deep/checkpoint/osnet_x0_25_market1501.pt"
 
 # --- Utility Functions ---
 
-def get_device():
-    """Determines the device to run the model on (CUDA or CPU)."""
-    return "cuda" if torch.cuda.is_available() else "cpu"
+def user_data_path(filename):
+    """Path of a writable per-user file kept between sessions (the app folder may be read-only when frozen)."""
+    data_dir = os.path.join(os.path.expanduser("~"), ".waste_detection")
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, filename)
+
+def create_strongsort(device=None, fp16=None):
+    """Builds a StrongSORT tracker, loading the OSNet re-ID weights from disk.
+
+    The re-ID network runs in half precision alongside an FP16 detector (CUDA only).
+    """
+    from Yolov7_StrongSORT_OSNet.strong_sort.strong_sort import StrongSORT
+
+    device = device or get_device()
+    if fp16 is None:
+        fp16 = resolve_model_variant(MODEL_VARIANT, device, MODEL_BACKEND)[0] == "fp16"
+    return StrongSORT(
+        model_weights=resource_path(STRONGSORT_WEIGHTS),
+        device=device,
+        fp16=fp16
+    )
+
+
+def reset_strongsort(strongsort):
+    """Clears tracks and re-ID features so a cached tracker can start a new session."""
+    tracker = strongsort.tracker
+    tracker.tracks = []
+    tracker._next_id = 1
+    tracker.metric.samples = {}
 
 
 def get_icon(icon_name, fallback_style_enum=None):
@@ -178,6 +226,10 @@ class SplashScreen(QSplashScreen):
 
 class IntroVideoScreen(QWidget):
     def __init__(self, video_path, on_finished_callback):
+        # Multimedia is only needed when the intro video plays (not with --fast-start)
+        from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+        from PyQt6.QtMultimediaWidgets import QVideoWidget
+
         super().__init__()
         self.on_finished_callback = on_finished_callback
         self.ended = False  # Prevent multiple callbacks
@@ -226,7 +278,7 @@ class IntroVideoScreen(QWidget):
         QShortcut(QKeySequence("Escape"), self, activated=self._end_video)
 
     def _media_status_changed(self, status):
-        if status == QMediaPlayer.MediaStatus.EndOfMedia:
+        if status == self.player.MediaStatus.EndOfMedia:
             self._end_video()
 
     def _handle_error(self, error):
@@ -253,167 +305,1738 @@ class IntroVideoScreen(QWidget):
 class ModelLoadThread(QThread):
     finished = pyqtSignal(object)
     progress = pyqtSignal(str)
+    timings = pyqtSignal(float, list)  # Load seconds, warm-up pass seconds; emitted before finished
 
-    def __init__(self, model_path):
+    def __init__(self, model_path, backend=MODEL_BACKEND, variant=MODEL_VARIANT):
         super().__init__()
         self.model_path = model_path
+        self.backend = backend
+        self.variant = variant
 
     def run(self):
         try:
-            self.progress.emit('<span style="color: black;">Initializing...</span>')
-            time.sleep(0.2)
             self.progress.emit('<span style="color: black;">Detecting hardware...</span>')
             device = get_device()
-            time.sleep(0.2)
-            self.progress.emit(f'<span style="color: black;">Loading YOLOv8 model on {device}...</span>')
-            model = YOLO(self.model_path).to(device)
-            time.sleep(0.5)
-            self.progress.emit('<span style="color: black;">Finalizing setup...</span>')
-            time.sleep(0.2)
+            variant, backend = resolve_model_variant(self.variant, device, self.backend)
+            backend_name = "ONNX Runtime" if backend == "onnx" else "PyTorch"
+            self.progress.emit(f'<span style="color: black;">Loading YOLOv8 model on {device} '
+                               f'({backend_name}, {variant.upper()})...</span>')
+            start_time = time.time()
+            model = load_model(self.model_path, device, backend, variant)
+            load_time = time.time() - start_time
+
+            # Pay for first-inference setup here rather than in the first measured processing time
+            self.progress.emit('<span style="color: black;">Warming up model...</span>')
+            warmup_times = warm_up_model(model)
+            self.timings.emit(load_time, warmup_times)
             self.finished.emit(model)
         except Exception as e:
             print(f"ModelLoadThread Error: {e}")
             self.progress.emit('<span style="color: black;">Error: Failed to load model.</span>')
             self.finished.emit(None)
 
-class MplCanvas(FigureCanvas):
-    def __init__(self, parent=None, width=5, height=4, dpi=100):
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        self.axes = fig.add_subplot(111)
-        super().__init__(fig)
-        self.setParent(parent)
-        self.setMinimumSize(300, 250) # Set a minimum size for the graph area
-        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-
-    def plot_data(self, data_dict):
-        # Example: A bar chart of detected plastic types
-        self.axes.clear() # Clear previous plot
-        if data_dict:
-            labels = list(data_dict.keys())
-            values = list(data_dict.values())
-            self.axes.bar(labels, values, color=['skyblue', 'lightcoral', 'lightgreen', 'orange'])
-            self.axes.set_title('Detected Plastic Types')
-            self.axes.set_ylabel('Count')
-            self.axes.set_xticks(range(len(labels))) # Ensure all labels are shown
-            self.axes.set_xticklabels(labels, rotation=45, ha='right') # Rotate for better readability
-            self.axes.set_yticks(np.arange(0, max(values) + 1, 1)) # Ensure integer y-ticks
+
+class ModulePreloadThread(QThread):
+    """Imports slow modules in the background so their first use on the GUI thread is instant."""
+
+    def __init__(self, module_names=PRELOAD_MODULES):
+        super().__init__()
+        self.module_names = module_names
+
+    def run(self):
+        for name in self.module_names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Preloading {name} failed: {e}")
+
+
+class TrackerLoadThread(QThread):
+    """Loads the StrongSORT re-ID weights alongside the detector."""
+    finished = pyqtSignal(object)  # StrongSORT instance, or None if it failed to load
+
+    def run(self):
+        try:
+            self.finished.emit(create_strongsort())
+        except Exception as e:
+            print(f"TrackerLoadThread Error: Failed to load StrongSORT: {e}")
+            self.finished.emit(None)
+
+# --- Camera Discovery ---
+
+
+def list_v4l2_cameras(sysfs_dir="/sys/class/video4linux"):
+    """Lists capture devices from Linux sysfs without opening them; None when sysfs is unavailable."""
+    if not os.path.isdir(sysfs_dir):
+        return None
+    cameras = []
+    for entry in os.listdir(sysfs_dir):
+        if not entry.startswith("video") or not entry[5:].isdigit():
+            continue
+        device_dir = os.path.join(sysfs_dir, entry)
+        try:
+            # A camera registers several nodes (e.g. metadata); its capture node has index 0
+            with open(os.path.join(device_dir, "index")) as f:
+                if f.read().strip() != "0":
+                    continue
+        except OSError:
+            pass
+        try:
+            with open(os.path.join(device_dir, "name")) as f:
+                device_name = f.read().strip()
+        except OSError:
+            device_name = ""
+        idx = int(entry[5:])
+        cameras.append((f"Camera {idx} ({device_name})" if device_name else f"Camera {idx}", idx))
+    return sorted(cameras, key=lambda cam: cam[1])
+
+
+def probe_camera(idx):
+    """Opens camera `idx` to check it exists; returns its dropdown entry or None."""
+    # Try DirectShow backend first (often better on Windows)
+    if sys.platform == "win32":
+        cap = cv2.VideoCapture(idx, cv2.CAP_DSHOW)
+        if cap.isOpened():
+            cap.release()
+            return (f"Camera {idx}", idx)
+        cap.release()
+    cap = cv2.VideoCapture(idx)  # Default backend
+    if cap.isOpened():
+        cap.release()
+        return (f"Camera {idx} (Default)" if sys.platform == "win32" else f"Camera {idx}", idx)
+    cap.release()
+    return None
+
+
+class CameraEnumerationThread(QThread):
+    """Finds available webcams off the GUI thread.
+
+    Linux devices are read from sysfs. Elsewhere the cameras found last time are
+    emitted straight away from the cache, then the indices are probed in parallel
+    (each bounded by CAMERA_PROBE_TIMEOUT) and the verified list is emitted and cached.
+    """
+    cameras_found = pyqtSignal(list)  # [(display name, camera index), ...]
+
+    def __init__(self, cache_file=None):
+        super().__init__()
+        self.cache_file = cache_file or user_data_path(CAMERA_CACHE_FILE)
+
+    def run(self):
+        cameras = list_v4l2_cameras() if sys.platform.startswith("linux") else None
+        if cameras is not None:
+            self.cameras_found.emit(cameras)
+            return
+
+        cached = self.load_cache()
+        if cached:
+            self.cameras_found.emit(cached)
+
+        cameras = self.probe_cameras(list(range(CAMERA_PROBE_INDICES)))
+        if cameras != cached:
+            self.cameras_found.emit(cameras)
+        self.save_cache(cameras)
+
+    @staticmethod
+    def probe_cameras(indices):
+        results = {}
+
+        def probe(idx):
+            try:
+                results[idx] = probe_camera(idx)
+            except Exception as e:
+                print(f"Error probing camera {idx}: {e}")
+
+        # Daemon threads: a hung driver call cannot be interrupted, and must not hold up app exit
+        probes = [threading.Thread(target=probe, args=(idx,), daemon=True) for idx in indices]
+        for thread in probes:
+            thread.start()
+        deadline = time.time() + CAMERA_PROBE_TIMEOUT
+        for idx, thread in zip(indices, probes):
+            thread.join(max(0.0, deadline - time.time()))
+            if thread.is_alive():
+                print(f"Camera {idx} probe timed out, skipping.")
+        return sorted((cam for cam in list(results.values()) if cam), key=lambda cam: cam[1])
+
+    def load_cache(self):
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("platform") != sys.platform:
+                return None
+            return [(name, int(idx)) for name, idx in data["cameras"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save_cache(self, cameras):
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump({"platform": sys.platform, "cameras": cameras}, f)
+        except OSError as e:
+            print(f"Could not save camera cache: {e}")
+
+# --- Startup ---
+
+
+class StartupOrchestrator(QObject):
+    """Loads the detector, the tracker and the webcam list concurrently from process start.
+
+    Results are kept and replayed to a window that attaches after they arrived, so the main
+    window can be built while loading is still under way.
+    """
+    progress = pyqtSignal(str)
+    model_loaded = pyqtSignal(object)
+    tracker_loaded = pyqtSignal(object)
+    cameras_found = pyqtSignal(list)
+
+    def __init__(self, model_path):
+        super().__init__()
+        self.model_path = model_path
+        self.model = self.tracker = self.cameras = None
+        self.model_load_time = None
+        self.warmup_times = []  # Seconds per warm-up pass, kept apart from the load time
+        self.model_done = self.tracker_done = False
+        self.started_at = None
+
+        self.model_thread = ModelLoadThread(model_path)
+        self.model_thread.progress.connect(self.progress)
+        self.model_thread.timings.connect(self.on_model_timings)
+        self.model_thread.finished.connect(self.on_model_loaded)
+        self.tracker_thread = TrackerLoadThread()
+        self.tracker_thread.finished.connect(self.on_tracker_loaded)
+        self.camera_thread = CameraEnumerationThread()
+        self.camera_thread.cameras_found.connect(self.on_cameras_found)
+        self.preload_thread = ModulePreloadThread()
+
+    def start(self):
+        self.started_at = time.time()
+        self.model_thread.start()
+        self.tracker_thread.start()
+        self.camera_thread.start()
+        self.preload_thread.start()
+        return self
+
+    def elapsed(self):
+        return time.time() - self.started_at
+
+    def on_model_timings(self, load_time, warmup_times):
+        self.model_load_time, self.warmup_times = load_time, warmup_times
+        print(f"Startup: model loaded in {load_time:.2f}s")
+        if warmup_times:
+            print(f"Startup: model warm-up {len(warmup_times)} passes in {sum(warmup_times):.2f}s "
+                  f"(first {warmup_times[0] * 1000:.0f} ms, last {warmup_times[-1] * 1000:.0f} ms)")
+
+    def on_model_loaded(self, model):
+        self.model, self.model_done = model, True
+        if model is not None:
+            print(f"Startup: model ready after {self.elapsed():.1f}s")
+            self.progress.emit(f'<span style="color: black;">Model ready ({self.elapsed():.1f}s)</span>')
+        self.model_loaded.emit(model)
+
+    def on_tracker_loaded(self, tracker):
+        self.tracker, self.tracker_done = tracker, True
+        print(f"Startup: tracker {'ready' if tracker is not None else 'failed'} after {self.elapsed():.1f}s")
+        self.tracker_loaded.emit(tracker)
+
+    def on_cameras_found(self, cameras):
+        self.cameras = cameras
+        print(f"Startup: {len(cameras)} webcam(s) found after {self.elapsed():.1f}s")
+        self.cameras_found.emit(cameras)
+
+    def attach(self, window):
+        """Connects a window's handlers and hands it whatever has already been loaded."""
+        self.progress.connect(window.update_splash_message)
+        self.model_loaded.connect(window.on_model_loaded)
+        self.tracker_loaded.connect(window.on_tracker_loaded)
+        self.cameras_found.connect(window.update_webcam_list)
+        if self.cameras is not None:
+            window.update_webcam_list(self.cameras)
+        if self.tracker_done:
+            window.on_tracker_loaded(self.tracker)
+        if self.model_done:
+            window.on_model_loaded(self.model)
+
+    def stop(self, timeout_ms=3000):
+        """Waits for loaders still running (e.g. on early close); a hung model load is terminated."""
+        if self.model_thread.isRunning():
+            print("Waiting for model loading thread...")
+            if not self.model_thread.wait(timeout_ms):
+                print("Model thread did not quit gracefully, terminating.")
+                self.model_thread.terminate()
+                self.model_thread.wait()
+        self.tracker_thread.wait(timeout_ms)
+        self.preload_thread.wait(timeout_ms)
+        self.camera_thread.wait(int(CAMERA_PROBE_TIMEOUT * 1000) + 1000)
+
+# --- Webcam Tracking Pipeline ---
+
+
+class FrameBuffer:
+    """Bounded, thread-safe frame queue that drops the oldest frame when full.
+
+    put(frame, block=True) instead waits for room, for sources that must not lose frames.
+    With latest_only (live cameras) get() returns the newest frame and drops the older ones.
+    Buffers created with the same condition can be waited on together by one consumer.
+    """
+
+    def __init__(self, maxsize=WEBCAM_FRAME_BUFFER_SIZE, condition=None, latest_only=False):
+        self._frames = deque(maxlen=maxsize)
+        self.condition = condition or threading.Condition()
+        self.latest_only = latest_only
+        self.closed = False
+
+    def __len__(self):
+        return len(self._frames)
+
+    def put(self, frame, block=False):
+        with self.condition:
+            while block and not self.closed and len(self._frames) == self._frames.maxlen:
+                self.condition.wait()
+            if self.closed:
+                return
+            self._frames.append(frame)  # deque(maxlen) discards the oldest entry
+            self.condition.notify_all()
+
+    def get(self, timeout=None):
+        """Returns the oldest (or with latest_only the newest) buffered frame, or None on timeout / once closed and drained."""
+        with self.condition:
+            if not self._frames and not self.closed:
+                self.condition.wait(timeout)
+            if self._frames:
+                if self.latest_only:
+                    frame = self._frames.pop()
+                    self._frames.clear()  # Stale frames would only put detection further behind the camera
+                else:
+                    frame = self._frames.popleft()
+                self.condition.notify_all()  # Wake a producer blocked on a full buffer
+                return frame
+            return None
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class WebcamCaptureThread(QThread):
+    """Reads frames from an opened cv2.VideoCapture into a FrameBuffer at camera rate."""
+    stream_lost = pyqtSignal()
+
+    MAX_CONSECUTIVE_FAILURES = 30
+
+    def __init__(self, cap, frame_buffer):
+        super().__init__()
+        self.cap = cap
+        self.frame_buffer = frame_buffer
+        self._running = False
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        self._running = True
+        failures = 0
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                failures += 1
+                if failures >= self.MAX_CONSECUTIVE_FAILURES:
+                    print("Webcam stream lost or unavailable.")
+                    self.stream_lost.emit()
+                    break
+                print("Failed to grab frame from webcam.")
+                time.sleep(0.01)
+                continue
+            failures = 0
+            self.frame_buffer.put(frame)
+        self.frame_buffer.close()
+
+
+class VideoFileCaptureThread(QThread):
+    """Decodes a video file into a FrameBuffer, keeping every frame_step-th frame.
+
+    In real-time mode frames are released at the file's frame rate into a latest-only
+    buffer, so the tracker always gets the current frame like a webcam's; otherwise
+    frames are pushed as fast as the tracker consumes them and none are dropped.
+    """
+    progress = pyqtSignal(int, int)  # frames read, total frames in the file (0 if unknown)
+
+    PROGRESS_INTERVAL = 15  # Frames read between progress signals
+
+    def __init__(self, cap, frame_buffer, frame_step=1, realtime=False):
+        super().__init__()
+        self.cap = cap
+        self.frame_buffer = frame_buffer
+        self.frame_step = max(1, frame_step)
+        self.realtime = realtime
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        total_frames = max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        start_time = time.time()
+        frame_index = 0
+        last_progress = 0
+        while not self._stop_event.is_set():
+            if frame_index % self.frame_step:
+                # Skipped frames are only demuxed, not decoded
+                if not self.cap.grab():
+                    break
+                frame_index += 1
+                continue
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                break
+            if self.realtime:
+                delay = start_time + frame_index / fps - time.time()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+            frame_index += 1
+            self.frame_buffer.put(frame, block=not self.realtime)
+            if frame_index - last_progress >= self.PROGRESS_INTERVAL:
+                last_progress = frame_index
+                self.progress.emit(frame_index, total_frames)
+        self.progress.emit(frame_index, total_frames)
+        self.frame_buffer.close()
+
+
+class TrackingSession:
+    """Tracker state for one video stream: its frame buffer, StrongSORT instance and track identities.
+
+    Sessions hold no model; a TrackingWorker detects on the frames of all its sessions
+    together and hands each session its own results.
+    """
+
+    def __init__(self, name, tracker, frame_buffer, source_name="webcam_tracked_frame", history_source="webcam_tracked"):
+        self.name = name
+        self.tracker = tracker
+        self.frame_buffer = frame_buffer
+        self.source_name = source_name  # Image source written to export rows
+        self.history_source = history_source  # Source type of the history records of its new objects
+        self.tracked_object_identities = {}
+        self.last_frame = None  # Last annotated BGR frame, kept for the multi-camera mosaic
+
+    @staticmethod
+    def tracks_to_detections(tracks):
+        """StrongSORT rows [x1, y1, x2, y2, track_id, class_id, conf] as a DETECTION_DTYPE array."""
+        detections = np.empty(len(tracks), dtype=DETECTION_DTYPE)
+        detections["box"] = tracks[:, :4]
+        detections["cls"] = tracks[:, 5]
+        detections["conf"] = tracks[:, 6]
+        return detections
+
+    def track(self, frame, results, names, annotate_fn):
+        """Updates this session's tracker with one frame's YOLO results and annotates the frame."""
+        tracks = np.empty((0, 7))
+        current_detections_for_display = []
+        newly_detected_rows = []  # Rows of `tracks` whose track id is seen for the first time
+
+        detections = extract_detections(results)
+        if len(detections):
+            tracks = self.tracker.update(xyxy_to_xywh(detections["box"]), detections["conf"],
+                                         detections["cls"].astype(int), frame)
         else:
-            self.axes.text(0.5, 0.5, "No data to display", horizontalalignment='center', verticalalignment='center', transform=self.axes.transAxes)
-        self.draw() # Redraw the canvas
-        
-class FlowLayout(QLayout):
-    def __init__(self, parent=None, margin=-1, hSpacing=-1, vSpacing=-1):
-        super(FlowLayout, self).__init__(parent)
-        if parent is not None:
-            self.setContentsMargins(margin, margin, margin, margin)
-        self.m_hSpace = hSpacing
-        self.m_vSpace = vSpacing
-        self.m_itemList = []
-
-    def __del__(self):
-        item = self.takeAt(0)
-        while item:
-            item = self.takeAt(0)
-
-    def addItem(self, item):
-        self.m_itemList.append(item)
-
-    def horizontalSpacing(self):
-        if self.m_hSpace >= 0:
-            return self.m_hSpace
+            self.tracker.increment_ages()
+
+        # Convert all tracks at once: boxes, track ids, class ids, confidences
+        tracks = np.asarray(tracks).reshape(-1, 7)
+        track_boxes = tracks[:, :4].astype(int).tolist()
+        track_ids = tracks[:, 4].astype(int).tolist()
+        track_classes = tracks[:, 5].astype(int).tolist()
+        track_confs = tracks[:, 6].astype(float).tolist()
+
+        # PRUNE old track identities if needed
+        current_ids = set(track_ids)
+        self.tracked_object_identities = {
+            tid: cls_id for tid, cls_id in self.tracked_object_identities.items() if tid in current_ids
+        }
+
+        for row, ((x1, y1, x2, y2), track_id, class_id, conf) in enumerate(
+                zip(track_boxes, track_ids, track_classes, track_confs)):
+            if track_id not in self.tracked_object_identities:
+                self.tracked_object_identities[track_id] = class_id
+                newly_detected_rows.append(row)
+                print(f"{self.name}: new object tracked: ID {track_id} as "
+                      f"{names.get(class_id, f'Class_{class_id}')}")
+            # Keep the class the object was first tracked as
+            class_id = self.tracked_object_identities[track_id]
+            display_class_name = names.get(class_id, f"Class_{class_id}")
+
+            current_detections_for_display.append({
+                "class": display_class_name,
+                "class_id": class_id,
+                "conf": round(conf, 4),
+                "box": [x1, y1, x2, y2],
+                "track_id": track_id
+            })
+
+        # Always draw — even if no tracks
+        export_rows = []
+        if len(current_detections_for_display) == 0:
+            annotated_frame = frame.copy()
+            text = "No plastics detected"
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            text_scale = 1.0
+            text_thickness = 2
+            text_size = cv2.getTextSize(text, font, text_scale, text_thickness)[0]
+            text_x = int((annotated_frame.shape[1] - text_size[0]) / 2)
+            text_y = 50
+
+            cv2.putText(
+                annotated_frame,
+                text,
+                (text_x, text_y),
+                font,
+                text_scale,
+                (0, 0, 255),   # Red text
+                text_thickness,
+                cv2.LINE_AA
+            )
         else:
-            return self.smartSpacing(QStyle.PixelMetric.PM_LayoutHorizontalSpacing)
+            annotated_frame, export_rows = annotate_fn(
+                frame, current_detections_for_display, self.source_name)
+
+        self.last_frame = annotated_frame
+        return current_detections_for_display, export_rows, self.tracks_to_detections(tracks[newly_detected_rows])
 
-    def verticalSpacing(self):
-        if self.m_vSpace >= 0:
-            return self.m_vSpace
+
+class TrackingWorker(QThread):
+    """Runs detection + StrongSORT for one or more TrackingSessions and emits finished, annotated results.
+
+    The next frame of every session (the newest one for live cameras, whose buffers are
+    latest_only; every frame in order for video files) is detected in a single batched forward
+    pass, so each extra camera costs far less than its own model call. With several
+    sessions their frame buffers must share one condition, and the emitted image is a
+    mosaic of every camera's latest annotated frame.
+
+    Everything emitted through frame_ready is plain data plus a QImage, so the GUI
+    thread only has to convert it to a pixmap and update labels.
+    """
+    frame_ready = pyqtSignal(object)
+
+    def __init__(self, model, sessions, model_lock, get_thresholds, annotate_fn):
+        super().__init__()
+        self.model = model
+        self.sessions = list(sessions)
+        self.model_lock = model_lock
+        self.get_thresholds = get_thresholds  # Called per batch so threshold edits apply live
+        self.annotate_fn = annotate_fn
+        self._condition = self.sessions[0].frame_buffer.condition
+        self._running = False
+
+    def stop(self):
+        self._running = False
+        for session in self.sessions:
+            session.frame_buffer.close()
+
+    def next_frames(self):
+        """Waits until any session has a frame; returns one frame (or None) per session, or None when done."""
+        buffers = [session.frame_buffer for session in self.sessions]
+        with self._condition:
+            while not any(len(buffer) for buffer in buffers):
+                if not self._running or all(buffer.closed for buffer in buffers):
+                    return None
+                self._condition.wait(0.1)
+            return [buffer.get(timeout=0) if len(buffer) else None for buffer in buffers]
+
+    def run(self):
+        self._running = True
+        while self._running:
+            frames = self.next_frames()
+            if frames is None:
+                break
+            try:
+                result = self.process_frames(frames)
+            except Exception as e:
+                print(f"Error processing webcam frame: {e}")
+                continue
+            if self._running:
+                self.frame_ready.emit(result)
+
+    def process_frames(self, frames):
+        """Detects on all available frames in one batch, then tracks and annotates each per session."""
+        confidence, iou = self.get_thresholds()
+        batch = [(session, frame) for session, frame in zip(self.sessions, frames) if frame is not None]
+
+        start_time = time.time()
+        with self.model_lock:
+            results = self.model.predict([frame for _, frame in batch], conf=confidence, iou=iou, verbose=False)
+        end_time = time.time()
+        proc_time_ms = (end_time - start_time) * 1000
+
+        detections, export_rows, new_objects = [], [], []
+        for (session, frame), frame_results in zip(batch, results):
+            session_detections, session_rows, session_new = session.track(
+                frame, frame_results, self.model.names, self.annotate_fn)
+            detections.extend(session_detections)
+            export_rows.extend(session_rows)
+            new_objects.append((session, session_new))
+
+        if len(self.sessions) == 1:
+            display_frame = self.sessions[0].last_frame
         else:
-            return self.smartSpacing(QStyle.PixelMetric.PM_LayoutVerticalSpacing)
+            display_frame = self.compose_mosaic()
+
+        # QImage (unlike QPixmap) may be built off the GUI thread; copy() detaches it from the numpy buffer
+        display_frame_rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
+        h, w, ch = display_frame_rgb.shape
+        bytes_per_line = ch * w
+        qt_img = QImage(display_frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888).copy()
+
+        return {
+            "image": qt_img,
+            "detections": detections,
+            "export_rows": export_rows,
+            "new_objects": new_objects,  # (session, DETECTION_DTYPE array) per frame in the batch
+            "processing_time_ms": proc_time_ms,
+            "frame_processing_time_ms": proc_time_ms / len(batch),
+            "confidence_threshold": confidence,
+            "iou_threshold": iou,
+        }
 
-    def count(self):
-        return len(self.m_itemList)
+    def compose_mosaic(self):
+        """Tiles each session's latest annotated frame into one grid image, labelled by camera."""
+        cols = math.ceil(math.sqrt(len(self.sessions)))
+        rows = math.ceil(len(self.sessions) / cols)
+        reference = next(s.last_frame for s in self.sessions if s.last_frame is not None)
+        tile_w = MOSAIC_TILE_WIDTH
+        tile_h = max(1, round(tile_w * reference.shape[0] / reference.shape[1]))
+
+        mosaic = np.zeros((rows * tile_h, cols * tile_w, 3), dtype=np.uint8)
+        for i, session in enumerate(self.sessions):
+            if session.last_frame is not None:
+                tile = cv2.resize(session.last_frame, (tile_w, tile_h), interpolation=cv2.INTER_AREA)
+                label = session.name
+            else:
+                tile = np.zeros((tile_h, tile_w, 3), dtype=np.uint8)
+                label = f"{session.name}: waiting for frames"
+            cv2.putText(tile, label, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 4, cv2.LINE_AA)
+            cv2.putText(tile, label, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+            y, x = (i // cols) * tile_h, (i % cols) * tile_w
+            mosaic[y:y + tile_h, x:x + tile_w] = tile
+        return mosaic
 
-    def itemAt(self, index):
-        if 0 <= index < len(self.m_itemList):
-            return self.m_itemList[index]
-        return None
+# --- Batch Image Inference ---
+
+
+class ImageInferenceThread(QThread):
+    """Runs the model over a set of image files in batches, decoding ahead in a thread pool."""
+    results_ready = pyqtSignal(object)  # list of partial history records for one batch
+    progress = pyqtSignal(int, int)  # images done, total
+
+    def __init__(self, model, model_lock, image_paths, iou_threshold,
+                 batch_size=BATCH_INFERENCE_SIZE, decode_workers=IMAGE_DECODE_WORKERS):
+        super().__init__()
+        self.model = model
+        self.model_lock = model_lock
+        self.image_paths = list(image_paths)
+        self.iou_threshold = iou_threshold
+        self.batch_size = max(1, batch_size)
+        self.decode_workers = max(1, decode_workers)
+        self._running = False
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        self._running = True
+        total = len(self.image_paths)
+        done = 0
+        # Keep one batch decoding while the previous one is on the model
+        batches = iter_decoded_batches(self.image_paths, self.batch_size, self.decode_workers)
+        try:
+            for batch_paths, images in batches:
+                if not self._running:
+                    break
+                try:
+                    records = infer_image_batch(
+                        self.model, self.model_lock, batch_paths, images, self.iou_threshold)
+                except Exception as e:
+                    print(f"Error in batch inference: {e}")
+                    records = []
+                done += len(batch_paths)
+                if records:
+                    self.results_ready.emit(records)
+                self.progress.emit(done, total)
+        finally:
+            batches.close()
+
+
+class ImagePrefetchThread(QThread):
+    """Decodes, and if needed runs the model on, the images around the one on screen.
+
+    Each request() replaces the previous one, so fast navigation only ever
+    works on the newest neighbourhood.
+    """
+    prefetched = pyqtSignal(str, object, object)  # path, decoded BGR image, partial history record or None
+
+    def __init__(self, model, model_lock, decode_workers=IMAGE_DECODE_WORKERS):
+        super().__init__()
+        self.model = model
+        self.model_lock = model_lock
+        self.decode_workers = max(1, decode_workers)
+        self._request = None
+        self._condition = threading.Condition()
+        self._running = True
+
+    def request(self, paths, infer_paths, iou_threshold):
+        """Queues paths for decoding; those in infer_paths also go through the model."""
+        with self._condition:
+            self._request = (list(paths), set(infer_paths), iou_threshold)
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=self.decode_workers) as pool:
+            while True:
+                with self._condition:
+                    while self._running and self._request is None:
+                        self._condition.wait()
+                    if not self._running:
+                        break
+                    paths, infer_paths, iou = self._request
+                    self._request = None
+
+                images = list(pool.map(cv2.imread, paths))
+                to_infer = [(path, img) for path, img in zip(paths, images)
+                            if path in infer_paths and img is not None]
+                records = {}
+                if to_infer:
+                    try:
+                        batch = infer_image_batch(self.model, self.model_lock,
+                                                  [p for p, _ in to_infer], [i for _, i in to_infer], iou)
+                        records = {record["image_path"]: record for record in batch}
+                    except Exception as e:
+                        print(f"Error in prefetch inference: {e}")
+                for path, img in zip(paths, images):
+                    if img is not None:
+                        self.prefetched.emit(path, img, records.get(path))
+
+# --- Detection Result Cache ---
+
+
+class DetectionResultCache:
+    """LRU cache of per-image detection results, independent of the history list.
+
+    Keys combine the absolute path with the file's mtime and size plus the
+    model used, so an edited file never reuses a stale result. Entries hold the
+    raw (pre-NMS) predictions, so any IoU can be applied to them later.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(abs_path, model_key):
+        """Returns the cache key for a file, or None if the file cannot be stat'ed."""
+        try:
+            stat = os.stat(abs_path)
+        except OSError:
+            return None
+        return (abs_path, stat.st_mtime_ns, stat.st_size, model_key)
+
+    def get(self, key):
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def __contains__(self, key):
+        return key is not None and key in self._entries
+
+    def put(self, key, raw, processing_time_ms):
+        if key is None:
+            return
+        self._entries[key] = {
+            "raw": raw,
+            "processing_time_ms": processing_time_ms,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# --- Gallery Thumbnails ---
+
+
+class ThumbnailTask(QRunnable):
+    """Produces one thumbnail on a pool thread: from the disk cache, else by a scaled decode of the original.
+
+    The disk cache is keyed by a hash of the absolute path, mtime and size, so an edited file is
+    decoded again; a cache hit touches its file so pruning removes the least recently used.
+    Only QImage is used here; pixmaps are made by the loader on the GUI thread.
+    """
+
+    def __init__(self, loader, path):
+        super().__init__()
+        self.setAutoDelete(False)  # The loader keeps the task until it reports back
+        self.loader = loader
+        self.path = path
+        self.started = False
 
-    def takeAt(self, index):
-        if 0 <= index < len(self.m_itemList):
-            return self.m_itemList.pop(index)
+    def run(self):
+        self.started = True
+        size = self.loader.size
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self.loader.decoded.emit(self.path, QImage(), "No Image")
+            return
+        key = hashlib.sha1(f"{os.path.abspath(self.path)}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+        cache_file = os.path.join(self.loader.cache_dir, f"{key}.png")
+        image = QImage(cache_file) if os.path.exists(cache_file) else QImage()
+        if not image.isNull():
+            try:
+                os.utime(cache_file)
+            except OSError:
+                pass  # Pruned or cleared meanwhile; the image is already read
+        else:
+            reader = QImageReader(self.path)
+            reader.setAutoTransform(True)
+            full_size = reader.size()
+            if full_size.isValid():
+                # Formats that support it (e.g. JPEG) decode straight to the small size
+                reader.setScaledSize(full_size.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio))
+            image = reader.read()
+            if image.isNull():
+                self.loader.decoded.emit(self.path, QImage(), "Invalid Image")
+                return
+            if image.width() > size or image.height() > size:
+                image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                                     Qt.TransformationMode.SmoothTransformation)
+            temp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+            if image.save(temp_file, "PNG"):
+                os.replace(temp_file, cache_file)  # Readers never see a half-written file
+        self.loader.decoded.emit(self.path, image, "")
+
+
+class ThumbnailLoader(QObject):
+    """Gallery thumbnails made off the GUI thread, kept in a bounded in-memory LRU and on disk.
+
+    request() answers from memory at once or queues a ThumbnailTask and returns None; the
+    result is announced by ready(path, pixmap or None, status) where status is "" on success,
+    else the text to show in place of the thumbnail.
+    """
+    ready = pyqtSignal(str, object, str)
+    decoded = pyqtSignal(str, QImage, str)  # Emitted by tasks on pool threads
+
+    def __init__(self, cache_dir, size=THUMBNAIL_SIZE, max_entries=THUMBNAIL_MEMORY_CACHE_SIZE,
+                 workers=THUMBNAIL_WORKERS, max_disk_bytes=THUMBNAIL_DISK_CACHE_MAX_BYTES):
+        super().__init__()
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.size = size
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # path -> (QPixmap or None, status)
+        self._tasks = {}  # path -> ThumbnailTask queued or running
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(workers)
+        self.disk_pool = QThreadPool()  # Cache file upkeep; never cleared, unlike the request queue
+        self.disk_pool.setMaxThreadCount(1)
+        self.decoded.connect(self.on_decoded)
+        self.disk_pool.start(self.prune_disk_cache)
+
+    def cache_files(self):
+        """(last used, size, path) of every file in the disk cache."""
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return files
+
+    def prune_disk_cache(self):
+        """Removes the least recently used thumbnail files until the cache fits max_disk_bytes."""
+        files = sorted(self.cache_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            self.remove_file(path)
+            total -= size
+
+    def remove_disk_cache(self):
+        for _, _, path in self.cache_files():
+            self.remove_file(path)
+
+    def clear(self):
+        """Forgets every thumbnail, in memory and on disk (files are removed in the background)."""
+        self.cancel_pending()
+        self._entries.clear()
+        self.disk_pool.start(self.remove_disk_cache)
+
+    @staticmethod
+    def remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already removed, or still open on Windows; a later prune retries
+
+    def request(self, path):
+        entry = self._entries.get(path)
+        if entry is not None:
+            self._entries.move_to_end(path)
+            return entry
+        if path not in self._tasks:
+            task = self._tasks[path] = ThumbnailTask(self, path)
+            self.pool.start(task)
         return None
 
-    def expandingDirections(self):
-        return Qt.Orientation(0) # Not expanding
+    def cancel_pending(self, keep=()):
+        """Drops queued requests except those for the paths in keep; running ones still finish."""
+        if not keep:
+            self.pool.clear()
+            self._tasks = {path: task for path, task in self._tasks.items() if task.started}
+            return
+        for path, task in list(self._tasks.items()):
+            if path not in keep and not task.started and self.pool.tryTake(task):
+                del self._tasks[path]
 
-    def hasHeightForWidth(self):
+    def on_decoded(self, path, image, status):
+        self._tasks.pop(path, None)
+        pixmap = QPixmap.fromImage(image) if not image.isNull() else None
+        self._entries[path] = (pixmap, status)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.ready.emit(path, pixmap, status)
+
+    def stop(self, timeout_ms=3000):
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
+        self.disk_pool.waitForDone(timeout_ms)
+
+# --- Detection History Store ---
+
+
+class AnalyticsAggregator:
+    """Running per-class totals for the analytics tab, updated on every history append.
+
+    Object counts and confidence sums are kept per class and per confidence
+    bucket ([0.00, 0.01), [0.01, 0.02), ..., [1.00, ...)), so totals above a
+    threshold are a sum over the buckets at or above it instead of a pass over
+    every detection. Thresholds on the 0.01 grid (what the threshold inputs
+    allow) are exact.
+    """
+
+    NUM_BUCKETS = 101
+    # float32 edges, so bucketing agrees with comparing the float32 confidences against a threshold
+    BUCKET_EDGES = (np.arange(NUM_BUCKETS) / 100).astype(np.float32)
+
+    def __init__(self):
+        self.counts = np.zeros((0, self.NUM_BUCKETS), dtype=np.int64)  # [class id, bucket]
+        self.confidence_sums = np.zeros((0, self.NUM_BUCKETS), dtype=np.float64)
+        self.num_records = 0
+        self.processing_time_sum = 0.0
+
+    def add(self, class_ids, confidences, processing_time_ms):
+        self.num_records += 1
+        self.processing_time_sum += float(processing_time_ms)
+        if not len(class_ids):
+            return
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        confidences = np.asarray(confidences, dtype=np.float32)
+        num_classes = int(class_ids.max()) + 1
+        if num_classes > len(self.counts):
+            extra = num_classes - len(self.counts)
+            self.counts = np.vstack([self.counts, np.zeros((extra, self.NUM_BUCKETS), np.int64)])
+            self.confidence_sums = np.vstack([self.confidence_sums, np.zeros((extra, self.NUM_BUCKETS))])
+        buckets = np.searchsorted(self.BUCKET_EDGES, confidences, side="right") - 1
+        np.add.at(self.counts, (class_ids, buckets), 1)
+        np.add.at(self.confidence_sums, (class_ids, buckets), confidences)
+
+    @classmethod
+    def first_bucket(cls, threshold):
+        """Index of the first bucket whose confidences are all >= threshold."""
+        return int(np.searchsorted(cls.BUCKET_EDGES, np.float32(threshold), side="left"))
+
+    def class_counts(self, threshold):
+        """Number of objects per class id with confidence >= threshold."""
+        return self.counts[:, self.first_bucket(threshold):].sum(axis=1)
+
+    def confidence_sum(self, threshold):
+        return float(self.confidence_sums[:, self.first_bucket(threshold):].sum())
+
+    def confidence_histogram(self):
+        """Objects per confidence bucket across all classes."""
+        return self.counts.sum(axis=0)
+
+    @property
+    def average_processing_time(self):
+        return self.processing_time_sum / self.num_records if self.num_records else 0
+
+
+class DetectionHistory:
+    """Columnar, append-only store for the session's detection history.
+
+    Records and detected objects live in parallel NumPy columns (timestamps as
+    int64 microseconds, class ids as int16, confidences as float32, boxes as
+    int32), with class names, sources and paths interned once. Indexing or
+    iterating yields the same dicts the old list held, so views that show a
+    handful of records are unchanged while aggregations can use the columns.
+    """
+
+    INITIAL_CAPACITY = 256
+
+    RECORD_COLUMNS = {
+        "timestamp_us": np.int64,
+        "source": np.int8,
+        "path": np.int32,  # -1 when the record has no image (webcam)
+        "processing_time_ms": np.float32,
+        "confidence_threshold": np.float32,
+        "iou_threshold": np.float32,
+        "object_start": np.int64,
+        "object_count": np.int32,
+    }
+
+    def __init__(self):
+        self.store = None  # HistoryStore that persists every appended record
+        self.clear()
+
+    def clear(self):
+        self._records = {name: np.empty(self.INITIAL_CAPACITY, dtype) for name, dtype in self.RECORD_COLUMNS.items()}
+        self._object_class = np.empty(self.INITIAL_CAPACITY, np.int16)
+        self._object_conf = np.empty(self.INITIAL_CAPACITY, np.float32)
+        self._object_box = np.empty((self.INITIAL_CAPACITY, 4), np.int32)
+        self._object_record = np.empty(self.INITIAL_CAPACITY, np.int32)
+        self._num_records = 0
+        self._num_objects = 0
+        self.class_names = []
+        self._class_ids = {}
+        self.source_types = []
+        self._source_ids = {}
+        self.paths = []
+        self._path_ids = {}
+        self.aggregates = AnalyticsAggregator()
+
+    # --- Interning ---
+    @staticmethod
+    def _intern(value, values, ids):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def class_id(self, class_name):
+        return self._intern(class_name, self.class_names, self._class_ids)
+
+    # --- Appending ---
+    @staticmethod
+    def _grown(column, needed):
+        if needed <= len(column):
+            return column
+        grown = np.empty((max(needed, 2 * len(column)),) + column.shape[1:], column.dtype)
+        grown[:len(column)] = column
+        return grown
+
+    def append(self, source_type, detections, image_path=None, processing_time_ms=0.0,
+               confidence_threshold=0.0, iou_threshold=0.0, names=None, timestamp=None):
+        """Adds one record and returns its id.
+
+        detections is either a DETECTION_DTYPE array (class ids resolved through
+        names) or a list of {"class", "conf", "box"} dicts.
+        """
+        if isinstance(detections, np.ndarray):
+            classes = [self.class_id(names.get(c, f"Class_{c}")) for c in detections["cls"].tolist()]
+            confs = detections["conf"]
+            boxes = detections["box"]
+        else:
+            classes = [self.class_id(det["class"]) for det in detections]
+            confs = [det["conf"] for det in detections]
+            boxes = np.asarray([det["box"] for det in detections], dtype=np.float64).reshape(-1, 4)
+
+        i = self._num_records
+        if i == len(self._records["timestamp_us"]):
+            self._records = {name: self._grown(column, i + 1) for name, column in self._records.items()}
+        start, count = self._num_objects, len(classes)
+        if start + count > len(self._object_class):
+            self._object_class = self._grown(self._object_class, start + count)
+            self._object_conf = self._grown(self._object_conf, start + count)
+            self._object_box = self._grown(self._object_box, start + count)
+            self._object_record = self._grown(self._object_record, start + count)
+
+        timestamp = timestamp or datetime.now()
+        columns = self._records
+        columns["timestamp_us"][i] = int(timestamp.timestamp() * 1_000_000)
+        columns["source"][i] = self._intern(source_type, self.source_types, self._source_ids)
+        columns["path"][i] = -1 if image_path is None else self._intern(image_path, self.paths, self._path_ids)
+        columns["processing_time_ms"][i] = processing_time_ms
+        columns["confidence_threshold"][i] = confidence_threshold
+        columns["iou_threshold"][i] = iou_threshold
+        columns["object_start"][i] = start
+        columns["object_count"][i] = count
+
+        end = start + count
+        self._object_class[start:end] = classes
+        self._object_conf[start:end] = confs
+        self._object_box[start:end] = boxes
+        self._object_record[start:end] = i
+        self.aggregates.add(self._object_class[start:end], self._object_conf[start:end], processing_time_ms)
+        self._num_records += 1
+        self._num_objects = end
+        if self.store is not None:
+            self.store.add(self[i])
+        return i + 1
+
+    # --- Columnar views (read-only slices up to the current length) ---
+    def record_column(self, name):
+        return self._records[name][:self._num_records]
+
+    @property
+    def object_classes(self):
+        return self._object_class[:self._num_objects]
+
+    @property
+    def object_records(self):
+        """Record index of every object, for grouping object columns per record."""
+        return self._object_record[:self._num_objects]
+
+    def records_with_classes(self, class_ids):
+        """Boolean mask over records that contain at least one object of the given classes."""
+        mask = np.zeros(self._num_records, dtype=bool)
+        if len(class_ids):
+            mask[self.object_records[np.isin(self.object_classes, class_ids)]] = True
+        return mask
+
+    def records_with_paths(self, path_ids):
+        """Boolean mask over records whose image path is one of the given interned paths."""
+        return np.isin(self.record_column("path"), path_ids)
+
+    def matching(self, class_filter=None, search_term=""):
+        """Boolean mask over records matching the History tab's filters (as HistoryStore.search matches them).
+
+        Class names and paths are matched once each, not per record.
+        """
+        keep = np.ones(self._num_records, dtype=bool)
+        if class_filter:
+            keep &= self.records_with_classes(
+                [i for i, name in enumerate(self.class_names) if class_filter in name.lower()])
+        if search_term:
+            path_match = self.records_with_paths(
+                [i for i, path in enumerate(self.paths) if search_term in path.lower()])
+            class_match = self.records_with_classes(
+                [i for i, name in enumerate(self.class_names) if search_term in name.lower()])
+            keep &= path_match | class_match
+        return keep
+
+    def search(self, class_filter=None, search_term="", after=None, limit=HISTORY_FETCH_SIZE):
+        """Returns (records newest first, key of the last one or None if no more match), like HistoryStore.search."""
+        keep = self.matching(class_filter, search_term)
+        timestamps = self.record_column("timestamp_us")
+        ids = np.arange(1, self._num_records + 1)
+        if after is not None:
+            keep &= (timestamps < after[0]) | ((timestamps == after[0]) & (ids < after[1]))
+        matching = np.flatnonzero(keep)
+        ordered = matching[np.lexsort((-matching, -timestamps[matching]))]  # Newest first, later records first on ties
+        page = ordered[:limit]
+        next_key = (int(timestamps[page[-1]]), int(page[-1]) + 1) if len(ordered) > limit else None
+        return [self[int(i)] for i in page], next_key
+
+    def count(self, class_filter=None, search_term=""):
+        return int(self.matching(class_filter, search_term).sum())
+
+    # --- Record views ---
+    def __len__(self):
+        return self._num_records
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._num_records
+        if not 0 <= index < self._num_records:
+            raise IndexError("history index out of range")
+        columns = self._records
+        start = int(columns["object_start"][index])
+        end = start + int(columns["object_count"][index])
+        path_id = int(columns["path"][index])
+        return {
+            "id": index + 1,
+            "timestamp": datetime.fromtimestamp(int(columns["timestamp_us"][index]) / 1_000_000),
+            "image_path": self.paths[path_id] if path_id >= 0 else None,
+            "source_type": self.source_types[columns["source"][index]],
+            "processing_time_ms": float(columns["processing_time_ms"][index]),
+            "confidence_threshold": float(columns["confidence_threshold"][index]),
+            "iou_threshold": float(columns["iou_threshold"][index]),
+            "detected_objects": [{
+                "class": self.class_names[cls_id],
+                "conf": round(conf, 4),
+                "box": box
+            } for cls_id, conf, box in zip(self._object_class[start:end].tolist(),
+                                            self._object_conf[start:end].tolist(),
+                                            self._object_box[start:end].tolist())]
+        }
+
+    def __iter__(self):
+        for index in range(self._num_records):
+            yield self[index]
+
+
+class HistoryStore(QThread):
+    """Persists the detection history to SQLite on a background thread.
+
+    The thread owns one long-lived connection (WAL journal), opens the database and then
+    writes appended records in batched transactions; saved records stay on disk and the
+    History tab reads them through search() and count(). add() only queues the record, so the frame loop never waits on disk;
+    the queue is bounded and drops its oldest records if the disk cannot keep up.
+
+    Records and their objects are stored in separate tables with class names and image
+    paths interned, indexed for the History tab's filters, with a trigram FTS index over
+    the paths for substring search. search() runs on a read-only connection of the GUI thread.
+    """
+    loaded = pyqtSignal(bool)  # Whether the database opened; if not, history stays in memory only
+
+    CLEAR = object()  # Queued marker so a clear is ordered with the inserts around it
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS classes (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE)",
+        """CREATE TABLE IF NOT EXISTS records (
+            id INTEGER PRIMARY KEY,
+            timestamp_us INTEGER NOT NULL,
+            source_type TEXT NOT NULL,
+            path_id INTEGER REFERENCES paths(id),
+            processing_time_ms REAL,
+            confidence_threshold REAL,
+            iou_threshold REAL
+        )""",
+        """CREATE TABLE IF NOT EXISTS objects (
+            record_id INTEGER NOT NULL REFERENCES records(id),
+            class_id INTEGER NOT NULL REFERENCES classes(id),
+            conf REAL,
+            x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_records_time ON records(timestamp_us, id)",
+        "CREATE INDEX IF NOT EXISTS idx_records_path ON records(path_id)",
+        "CREATE INDEX IF NOT EXISTS idx_objects_record ON objects(record_id)",
+        "CREATE INDEX IF NOT EXISTS idx_objects_class ON objects(class_id, record_id)",
+    )
+    # External-content FTS table kept in step with paths by triggers (trigram needs SQLite 3.34+)
+    FTS_SCHEMA = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS path_search USING fts5(path, content='paths', content_rowid='id', tokenize='trigram')",
+        """CREATE TRIGGER IF NOT EXISTS paths_ai AFTER INSERT ON paths BEGIN
+            INSERT INTO path_search(rowid, path) VALUES (new.id, new.path);
+        END""",
+    )
+    FTS_MIN_TERM = 3  # Trigram index only answers terms of at least three characters
+    MAX_SORTED_MATCHES = 20000  # Up to this many matches are sorted; beyond, pages walk the time index
+    COUNT_CACHE_SIZE = 32  # Filter combinations whose counts are kept
+
+    def __init__(self, db_path, buffer_size=HISTORY_WRITE_BUFFER_SIZE):
+        super().__init__()
+        self.db_path = db_path
+        self._pending = deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._writing = False  # A popped batch is not committed yet
+        self._flush_requested = False
+        self.dropped = 0
+        self.available = False  # Database opened; search() may be used
+        self.has_fts = False
+        self._reader = None
+        self._counts = OrderedDict()  # (class_filter, search_term) -> (count, newest record id counted)
+        self._clears = 0  # Clears committed by the writer; a count begun before one is not cached
+        # Writer-thread caches of interned ids
+        self._class_ids = {}
+        self._path_ids = {}
+
+    # --- Called from the GUI thread ---
+    def add(self, record):
+        with self._condition:
+            if self._closed:
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1  # deque(maxlen) discards the oldest entry
+            self._pending.append(record)
+            if len(self._pending) >= HISTORY_WRITE_BATCH_SIZE:
+                self._condition.notify_all()
+
+    def clear(self):
+        with self._condition:
+            self._pending.append(self.CLEAR)
+            self._condition.notify_all()
+
+    def flush(self, timeout=HISTORY_FLUSH_TIMEOUT):
+        """Has the writer commit everything queued now and waits for it, so a query sees the latest records."""
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            deadline = time.time() + timeout
+            while (self._pending or self._writing) and not self.isFinished():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
         return True
 
-    def heightForWidth(self, width):
-        height = self._doLayout(QRect(0, 0, width, 0), True)
-        return height
-
-    def setGeometry(self, rect):
-        super(FlowLayout, self).setGeometry(rect)
-        self._doLayout(rect, False)
-
-    def sizeHint(self):
-        return self.minimumSize()
-
-    def minimumSize(self):
-        size = QSize()
-        for item in self.m_itemList:
-            size = size.expandedTo(item.minimumSize())
-        margin, _, _, _ = self.getContentsMargins() # In Qt6, getContentsMargins returns tuple
-        size += QSize(2 * margin, 2 * margin)
-        return size
-
-    def _doLayout(self, rect, testOnly):
-        left, top, right, bottom = self.getContentsMargins()
-        effectiveRect = rect.adjusted(+left, +top, -right, -bottom)
-        x = effectiveRect.x()
-        y = effectiveRect.y()
-        lineHeight = 0
-
-        for item in self.m_itemList:
-            wid = item.widget()
-            spaceX = self.horizontalSpacing()
-            if spaceX == -1:
-                spaceX = wid.style().layoutSpacing(QSizePolicy.ControlType.PushButton, QSizePolicy.ControlType.PushButton, Qt.Orientation.Horizontal)
-            spaceY = self.verticalSpacing()
-            if spaceY == -1:
-                spaceY = wid.style().layoutSpacing(QSizePolicy.ControlType.PushButton, QSizePolicy.ControlType.PushButton, Qt.Orientation.Vertical)
-
-            nextX = x + item.sizeHint().width() + spaceX
-            if nextX - spaceX > effectiveRect.right() and lineHeight > 0:
-                x = effectiveRect.x()
-                y = y + lineHeight + spaceY
-                nextX = x + item.sizeHint().width() + spaceX
-                lineHeight = 0
-
-            if not testOnly:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
-
-            x = nextX
-            lineHeight = max(lineHeight, item.sizeHint().height())
-
-        return y + lineHeight - rect.y() + bottom
-
-    def smartSpacing(self, pm):
-        parent = self.parent()
-        if parent is None:
-            return -1
-        elif parent.isWidgetType():
-            return parent.style().pixelMetric(pm, None, parent)
+    def stop(self):
+        """Stops accepting records; the thread writes what is queued and closes the database."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def reader(self):
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.db_path)
+            self._reader.execute("PRAGMA query_only=1")
+        return self._reader
+
+    def search(self, class_filter=None, search_term="", after=None, limit=HISTORY_FETCH_SIZE):
+        """Returns (records newest first, key of the last one or None if no more match) for the History tab.
+
+        class_filter matches records with an object whose class name contains it; search_term
+        matches records whose image path or one of whose class names contains it (both lowercase).
+        after is the key returned for the previous page: pages continue from a (timestamp, id)
+        position in the time index rather than an offset, so deep pages cost the same as the first.
+        """
+        conn = self.reader()
+        filters = self.filter_sql(conn, class_filter, search_term)
+        clauses, params = [], []
+        if filters is not None:
+            ids_sql, ids_params, scan_sql, scan_params = filters
+            if self.count(class_filter, search_term) <= self.MAX_SORTED_MATCHES:
+                clauses, params = [f"r.id IN ({ids_sql})"], list(ids_params)  # Few matches: sort them
+            else:
+                clauses, params = [scan_sql], list(scan_params)  # Many matches: a page is found after a short walk
+        if after is not None:
+            clauses.append("(r.timestamp_us, r.id) < (?, ?)")
+            params += after
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = conn.execute(
+            "SELECT r.id, r.timestamp_us, p.path, r.source_type, r.processing_time_ms, r.confidence_threshold, "
+            f"r.iou_threshold FROM records r LEFT JOIN paths p ON p.id = r.path_id {where} "
+            "ORDER BY r.timestamp_us DESC, r.id DESC LIMIT ?", params + [limit + 1]).fetchall()
+        next_key = (rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return self.records_from_rows(conn, rows[:limit]), next_key
+
+    def count(self, class_filter=None, search_term=""):
+        """Number of records matching the filters.
+
+        Counts are cached per filter together with the newest record id they cover; records are
+        only ever appended (the writer drops the cache once it commits a clear, after which ids
+        start over), so a cached count is brought up to date by counting just the records added since.
+        """
+        conn = self.reader()
+        key = (class_filter or None, search_term or "")
+        with self._condition:
+            cached = self._counts.pop(key, None)
+            clears = self._clears
+        filters = self.filter_sql(conn, class_filter, search_term)
+        conn.execute("BEGIN")  # One snapshot, so the count and the newest id agree while the writer commits
+        try:
+            newest_id = conn.execute("SELECT MAX(id) FROM records").fetchone()[0] or 0
+            if cached is None:
+                if filters is None:
+                    total = conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+                else:
+                    total = conn.execute(f"SELECT COUNT(*) FROM ({filters[0]})", filters[1]).fetchone()[0]
+            else:
+                total, counted_id = cached
+                if newest_id > counted_id:
+                    where, params = "", []
+                    if filters is not None:
+                        where, params = f"AND {filters[2]}", list(filters[3])
+                    total += conn.execute(f"SELECT COUNT(*) FROM records r WHERE r.id > ? {where}",
+                                          [counted_id] + params).fetchone()[0]
+        finally:
+            conn.execute("COMMIT")
+        with self._condition:
+            if clears == self._clears:  # Otherwise the snapshot may predate the clear
+                self._counts[key] = (total, newest_id)
+                if len(self._counts) > self.COUNT_CACHE_SIZE:
+                    self._counts.popitem(last=False)
+        return total
+
+    def filter_sql(self, conn, class_filter, search_term):
+        """SQL for the records matching the filters, or None without filters.
+
+        Returns (ids_sql, ids_params, scan_sql, scan_params): ids_sql selects the distinct matching
+        record ids from the class and path indexes (cost grows with the matches), scan_sql tests
+        records r one by one while the time index is walked (cost grows with the records skipped).
+        """
+        if not class_filter and not search_term:
+            return None
+        class_names = conn.execute("SELECT id, name FROM classes").fetchall()
+
+        def class_ids(term):
+            ids = [class_id for class_id, name in class_names if term in name.lower()]
+            return ",".join("?" * len(ids)), ids
+
+        def has_class(record, marks):
+            return f"EXISTS (SELECT 1 FROM objects o WHERE o.record_id = {record}.id AND o.class_id IN ({marks}))"
+
+        ids_sql, ids_params, scan_clauses, scan_params = None, [], [], []
+        if search_term:
+            if self.has_fts and len(search_term) >= self.FTS_MIN_TERM:
+                paths_sql = "SELECT rowid FROM path_search WHERE path_search MATCH ?"
+                path_param = '"' + search_term.replace('"', '""') + '"'
+            else:
+                paths_sql = "SELECT id FROM paths WHERE instr(lower(path), ?) > 0"
+                path_param = search_term
+            marks, ids = class_ids(search_term)
+            ids_sql = (f"SELECT id FROM records WHERE path_id IN ({paths_sql}) "
+                       f"UNION SELECT record_id FROM objects WHERE class_id IN ({marks})")
+            ids_params += [path_param] + ids
+            scan_clauses.append(f"(r.path_id IN ({paths_sql}) OR {has_class('r', marks)})")
+            scan_params += [path_param] + ids
+        if class_filter:
+            marks, ids = class_ids(class_filter)
+            if ids_sql:  # Search matches are usually the fewer, so they are probed for the class
+                ids_sql = f"SELECT id FROM ({ids_sql}) s WHERE {has_class('s', marks)}"
+            else:
+                ids_sql = f"SELECT DISTINCT record_id AS id FROM objects WHERE class_id IN ({marks})"
+            ids_params += ids
+            scan_clauses.append(has_class('r', marks))
+            scan_params += ids
+        return ids_sql, ids_params, " AND ".join(scan_clauses), scan_params
+
+    @staticmethod
+    def records_from_rows(conn, rows):
+        """Builds history record dicts (as DetectionHistory yields them) for rows of the records table."""
+        objects = defaultdict(list)
+        if rows:
+            record_ids = [row[0] for row in rows]
+            for record_id, name, conf, x1, y1, x2, y2 in conn.execute(
+                    "SELECT o.record_id, c.name, o.conf, o.x1, o.y1, o.x2, o.y2 FROM objects o "
+                    f"JOIN classes c ON c.id = o.class_id WHERE o.record_id IN ({','.join('?' * len(record_ids))}) "
+                    "ORDER BY o.rowid", record_ids):
+                objects[record_id].append({"class": name, "conf": round(conf, 4), "box": [x1, y1, x2, y2]})
+        return [{
+            "id": record_id,
+            "timestamp": datetime.fromtimestamp(timestamp_us / 1_000_000),
+            "image_path": path,
+            "source_type": source_type,
+            "processing_time_ms": proc_time_ms or 0.0,
+            "confidence_threshold": conf or 0.0,
+            "iou_threshold": iou or 0.0,
+            "detected_objects": objects[record_id]
+        } for record_id, timestamp_us, path, source_type, proc_time_ms, conf, iou in rows]
+
+    # --- Writer thread ---
+    def open_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits may be lost on power failure
+        with conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+        try:
+            with conn:
+                for statement in self.FTS_SCHEMA:
+                    conn.execute(statement)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            print(f"History: path search index unavailable ({e}), searching paths without it")
+        self.migrate_legacy_table(conn)
+        return conn
+
+    def migrate_legacy_table(self, conn):
+        """Moves records of the older single-table layout (objects as a JSON column) into the current tables."""
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'detections'").fetchone():
+            return
+        rows = conn.execute(
+            "SELECT timestamp, image_path, source_type, processing_time_ms, confidence_threshold, "
+            "iou_threshold, detected_objects FROM detections ORDER BY id").fetchall()
+        records = [{
+            "timestamp": datetime.fromisoformat(timestamp),
+            "image_path": image_path,
+            "source_type": source_type,
+            "processing_time_ms": proc_time_ms or 0.0,
+            "confidence_threshold": conf or 0.0,
+            "iou_threshold": iou or 0.0,
+            "detected_objects": json.loads(objects or "[]")
+        } for timestamp, image_path, source_type, proc_time_ms, conf, iou, objects in rows]
+        with conn:
+            self.insert_records(conn, records)
+            conn.execute("DROP TABLE detections")
+        print(f"History: moved {len(records)} records to the indexed layout")
+
+    def intern_class(self, conn, name):
+        class_id = self._class_ids.get(name)
+        if class_id is None:
+            row = conn.execute("SELECT id FROM classes WHERE name = ?", (name,)).fetchone()
+            class_id = row[0] if row else conn.execute("INSERT INTO classes (name) VALUES (?)", (name,)).lastrowid
+            self._class_ids[name] = class_id
+        return class_id
+
+    def intern_path(self, conn, path):
+        if path is None:
+            return None
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            row = conn.execute("SELECT id FROM paths WHERE path = ?", (path,)).fetchone()
+            path_id = row[0] if row else conn.execute("INSERT INTO paths (path) VALUES (?)", (path,)).lastrowid
+            if len(self._path_ids) >= HISTORY_WRITE_BUFFER_SIZE:
+                self._path_ids.clear()  # Paths repeat within a session; the cache only has to cover recent ones
+            self._path_ids[path] = path_id
+        return path_id
+
+    def insert_records(self, conn, records):
+        objects = []
+        for record in records:
+            record_id = conn.execute(
+                "INSERT INTO records (timestamp_us, source_type, path_id, processing_time_ms, confidence_threshold, "
+                "iou_threshold) VALUES (?, ?, ?, ?, ?, ?)",
+                (int(record["timestamp"].timestamp() * 1_000_000), record["source_type"],
+                 self.intern_path(conn, record["image_path"]), record["processing_time_ms"],
+                 record["confidence_threshold"], record["iou_threshold"])).lastrowid
+            objects += [(record_id, self.intern_class(conn, det["class"]), det["conf"], *det["box"])
+                        for det in record["detected_objects"]]
+        conn.executemany("INSERT INTO objects (record_id, class_id, conf, x1, y1, x2, y2) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         objects)
+
+    def clear_database(self, conn):
+        for table in ("objects", "records", "paths", "classes"):
+            conn.execute(f"DELETE FROM {table}")
+        if self.has_fts:
+            conn.execute("INSERT INTO path_search(path_search) VALUES ('delete-all')")
+        self._class_ids.clear()
+        self._path_ids.clear()
+
+    def write_batch(self, conn, batch):
+        records, cleared = [], False
+        with conn:  # One transaction per batch
+            for record in batch:
+                if record is self.CLEAR:
+                    self.insert_records(conn, records)
+                    records = []
+                    self.clear_database(conn)
+                    cleared = True
+                else:
+                    records.append(record)
+            self.insert_records(conn, records)
+        if cleared:
+            with self._condition:  # Only now are the counted records gone
+                self._clears += 1
+                self._counts.clear()
+
+    def next_batch(self):
+        """Waits until a full batch is queued, the write interval passed, a flush was asked for or the store stopped."""
+        with self._condition:
+            deadline = time.time() + HISTORY_WRITE_INTERVAL
+            while not self._closed and not self._flush_requested and len(self._pending) < HISTORY_WRITE_BATCH_SIZE:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            count = min(len(self._pending), HISTORY_WRITE_BATCH_SIZE)
+            batch = [self._pending.popleft() for _ in range(count)]
+            self._writing = bool(batch)
+            if not self._pending:
+                self._flush_requested = False
+            dropped, self.dropped = self.dropped, 0
+            return batch, dropped, self._closed and not self._pending
+
+    def run(self):
+        try:
+            conn = self.open_database()
+            print(f"History: opened '{self.db_path}'")
+            self.available = True
+            self.loaded.emit(True)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error opening history database '{self.db_path}': {e}")
+            self.loaded.emit(False)
+            with self._condition:
+                self._closed = True
+                self._pending.clear()
+                self._condition.notify_all()
+            return
+
+        try:
+            done = False
+            while not done:
+                batch, dropped, done = self.next_batch()
+                if dropped:
+                    print(f"Warning: history writer fell behind, {dropped} records were not saved.")
+                if batch:
+                    try:
+                        self.write_batch(conn, batch)
+                    except sqlite3.Error as e:
+                        print(f"Error saving {len(batch)} history records: {e}")
+                        self._class_ids.clear()  # Ids cached during the rolled-back transaction may not exist
+                        self._path_ids.clear()
+                    with self._condition:
+                        self._writing = False
+                        self._condition.notify_all()
+        finally:
+            conn.close()
+
+
+# --- History Gallery (model/view) ---
+
+
+class HistoryGalleryModel(QAbstractListModel):
+    """History records for the gallery, fetched from a history source as the view scrolls.
+
+    The source is the HistoryStore or, until it has loaded, the session's DetectionHistory.
+    Rows are appended by fetchMore() one key-paged batch at a time, so only the part of the
+    history the user scrolls through is ever read.
+    """
+    RecordRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = None
+        self.filters = (None, "")
+        self.records = []
+        self.next_key = None  # Key of the last fetched record, where the next batch starts
+        self.has_more = False
+        self.rows_by_path = defaultdict(list)  # Rows to repaint when an image's thumbnail arrives
+
+    def reset(self, source, class_filter=None, search_term=""):
+        self.beginResetModel()
+        self.source = source
+        self.filters = (class_filter, search_term)
+        self.records = []
+        self.next_key = None
+        self.has_more = source is not None
+        self.rows_by_path.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != self.RecordRole:
+            return None
+        return self.records[index.row()]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.has_more:
+            return
+        records, self.next_key = self.source.search(*self.filters, after=self.next_key, limit=HISTORY_FETCH_SIZE)
+        self.has_more = self.next_key is not None
+        if not records:
+            return
+        first = len(self.records)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        for row, record in enumerate(records, first):
+            self.records.append(record)
+            if record['image_path']:
+                self.rows_by_path[record['image_path']].append(row)
+        self.endInsertRows()
+
+    def thumbnail_ready(self, path):
+        for row in self.rows_by_path.get(path, ()):
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+
+class GalleryTileDelegate(QStyledItemDelegate):
+    """Paints a history record as a gallery tile: thumbnail, class summary, date and a details button.
+
+    Only visible rows are painted, so thumbnails are requested from the loader for those alone;
+    a placeholder is painted until the model reports the thumbnail ready.
+    """
+    details_requested = pyqtSignal(dict)
+
+    TEXT_HEIGHT = 18
+    BUTTON_HEIGHT = 22
+
+    def __init__(self, thumbnail_loader, summary_fn, thumb_size=THUMBNAIL_SIZE, parent=None):
+        super().__init__(parent)
+        self.thumbnail_loader = thumbnail_loader
+        self.summary_fn = summary_fn  # record detections -> tile text
+        self.thumb_size = thumb_size
+        self.stream_pixmap = get_icon("webcam_play.svg", QStyle.StandardPixmap.SP_MediaPlay).pixmap(QSize(64, 64))
+
+    def sizeHint(self, option, index):
+        return QSize(self.thumb_size, self.thumb_size + 65) # Thumbnail plus label/button heights
+
+    def button_rect(self, rect):
+        return QRect(rect.x() + 4, rect.bottom() - self.BUTTON_HEIGHT - 2, rect.width() - 8, self.BUTTON_HEIGHT)
+
+    def paint(self, painter, option, index):
+        record = index.data(HistoryGalleryModel.RecordRole)
+        if record is None:
+            return
+        rect = option.rect
+        size = self.thumb_size
+        painter.save()
+        painter.fillRect(rect, QColor("#FFFFFF"))
+        painter.setPen(QPen(QColor("black")))
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+        # Thumbnail
+        thumb_rect = QRect(rect.x() + 1, rect.y() + 1, size - 2, size - 2)
+        image_path, source_type = record['image_path'], record['source_type']
+        pixmap, text, color = None, "No Image", "#A0A7B9"
+        if source_type == 'file' and image_path:
+            thumbnail = self.thumbnail_loader.request(image_path)
+            if thumbnail is None:
+                text = "Loading..."
+            else:
+                pixmap, status = thumbnail
+                if pixmap is None:
+                    text, color = status, "#BF616A" if status == "Invalid Image" else "#A0A7B9"
+        elif 'webcam' in source_type or 'video' in source_type:
+            painter.fillRect(thumb_rect, QColor("#353A4C"))
+            pixmap = self.stream_pixmap
+        if pixmap is not None:
+            target = pixmap.rect()
+            target.moveCenter(thumb_rect.center())
+            painter.drawPixmap(target, pixmap)
         else:
-            return parent.spacing()
-        
+            painter.setPen(QColor(color))
+            painter.drawText(thumb_rect, Qt.AlignmentFlag.AlignCenter, text)
+
+        # Info and date
+        painter.setPen(QColor("black"))
+        text_rect = QRect(rect.x() + 4, rect.y() + size + 3, rect.width() - 8, self.TEXT_HEIGHT)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         option.fontMetrics.elidedText(self.summary_fn(record['detected_objects']),
+                                                       Qt.TextElideMode.ElideRight, text_rect.width()))
+        text_rect.translate(0, self.TEXT_HEIGHT)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         record['timestamp'].strftime("%Y-%m-%d %H:%M:%S"))
+
+        # Details button
+        button_rect = self.button_rect(rect)
+        painter.fillRect(button_rect, QColor("#A9A9A9"))
+        painter.drawRect(button_rect)
+        painter.drawText(button_rect, Qt.AlignmentFlag.AlignCenter, "View Details")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self.button_rect(option.rect).contains(event.position().toPoint())):
+            self.details_requested.emit(index.data(HistoryGalleryModel.RecordRole))
+            return True
+        return False
+
 
 # --- Main Application Window ---
 
 
 class WasteDetectionApp(QWidget):
-    def __init__(self, splash=None):
+    def __init__(self, splash=None, startup=None):
         super().__init__()
         self.setWindowIcon(QIcon(resource_path("icons/app_logo.png")))
 
@@ -428,18 +2051,42 @@ class WasteDetectionApp(QWidget):
         self.image_paths = []
         self.processed_results_for_export = []
         self.webcam_running = False
+        self.video_running = False  # A video file is feeding the tracking pipeline
+        self.video_path = None
+        self.video_started_at = 0
+        self.video_frames_read = 0
+        self.last_video_display_time = 0
         self.original_pixmap = None
         self.latest_detection_details = []  # Export data for CURRENT view
 
         # --- In-Memory Storage ---
-        self.detection_history_memory = []
+        self.detection_history_memory = DetectionHistory()  # This session only; saved records are queried from the HistoryStore
+        self.result_cache = DetectionResultCache()  # O(1) lookup of prior results by file + model
+        self.thumbnail_loader = ThumbnailLoader(user_data_path(THUMBNAIL_CACHE_DIR))
+        self.model_key = None
+        self.class_resolver = PlasticClassResolver({}, [])  # Rebuilt by setup_stat_cards once the model is loaded
+
+        # --- Image on screen, kept so threshold edits need no disk read or inference ---
+        self.current_frame = None  # Decoded BGR image
+        self.current_raw = None  # Raw (pre-NMS) detections as a DETECTION_DTYPE array
+        self.current_keep = None  # Indices into current_raw surviving NMS at current_keep_iou
+        self.current_keep_iou = None
+        self.current_proc_time_ms = 0
+        self.current_source_name = "image"
 
         # --- Webcam Tracking State ---
-        self.tracked_object_identities = {}
+        # Track identities live on each TrackingSession, created fresh when tracking starts
+        self.capture_threads = []  # One per camera, or one for a video file
+        self.tracking_worker = None
+        self.strongsort = None  # Loaded once by TrackerLoadThread (via StartupOrchestrator), reset between sessions
+        self.extra_trackers = []  # Trackers for the second and later cameras of a multi-camera session
+        self.batch_inference_thread = None
+        self.batch_progress = None  # (done, total) while a dropped image set is being processed
+        self.prefetch_thread = None
+        self.prefetched_images = OrderedDict()  # abs path -> decoded BGR image, small LRU around the current image
+        self.model_lock = threading.Lock()  # YOLO predictors are not safe to call from two threads at once
 
         # History tab state
-        self.current_history_page = 1
-        self.total_history_pages = 1
 
         self.open_accordion_frame = None  # Track the currently open frame
         self.open_accordion_button = None # Track the currently open button
@@ -451,12 +2098,18 @@ class WasteDetectionApp(QWidget):
         self.initUI()
         self.apply_stylesheet()
 
-        model_file_path = resource_path("best.pt")
+        # The model, tracker and webcam list load in the background (started by __main__ at process start)
+        self.startup = startup or StartupOrchestrator(resource_path(MODEL_FILE)).start()
         # model_file_path = "C:/Users/mariel/thesis/weights/best.pt"
-        self.model_thread = ModelLoadThread(model_file_path)
-        self.model_thread.progress.connect(self.update_splash_message)
-        self.model_thread.finished.connect(self.on_model_loaded)
-        self.model_thread.start()
+        # Backends and precisions differ in their results, so cached detections are kept apart
+        self.model_key = f"{self.startup.model_path}|{MODEL_BACKEND}|{MODEL_VARIANT}"
+        self.startup.attach(self)
+
+        # Saved history stays in the database, opened on the store's thread and paged by the History tab
+        self.history_store = HistoryStore(user_data_path(HISTORY_DB_FILE))
+        self.history_store.loaded.connect(self.on_history_loaded)
+        self.detection_history_memory.store = self.history_store
+        self.history_store.start()
 
     def update_splash_message(self, message):
         if self.splash:
@@ -482,6 +2135,8 @@ class WasteDetectionApp(QWidget):
                         self.nav_buttons[btn_name].setEnabled(False)
             if hasattr(self, 'webcam_btn'):
                 self.webcam_btn.setEnabled(False)
+            if hasattr(self, 'video_btn'):
+                self.video_btn.setEnabled(False)
             if hasattr(self, 'drop_frame'):
                 self.drop_frame.setEnabled(False)
             if hasattr(self, 'export_btn'):
@@ -497,7 +2152,10 @@ class WasteDetectionApp(QWidget):
             print("Warning: Model has no class names. Using placeholders.")
             self.model.names = {i: f"Class_{i}" for i in range(80)}
 
-        self.update_webcam_list()
+        self.prefetch_thread = ImagePrefetchThread(self.model, self.model_lock)
+        self.prefetch_thread.prefetched.connect(self.on_image_prefetched)
+        self.prefetch_thread.start()
+
         self.setup_stat_cards()  # Needs model.names
         self.populate_history_filter_combo()  # Populate history filter
 
@@ -505,7 +2163,9 @@ class WasteDetectionApp(QWidget):
         if hasattr(self, 'drop_frame'):
             self.drop_frame.setEnabled(True)
         if hasattr(self, 'webcam_btn'):
-            self.webcam_btn.setEnabled(True)
+            self.webcam_btn.setEnabled(self.webcam_dropdown.currentData() not in (None, -1))
+        if hasattr(self, 'video_btn'):
+            self.video_btn.setEnabled(True)
         if hasattr(self, 'export_btn'):
             self.export_btn.setEnabled(True)
         if hasattr(self, 'clear_btn'):
@@ -518,7 +2178,6 @@ class WasteDetectionApp(QWidget):
             self.clear_history_btn.setEnabled(True)
 
     #    QTimer.singleShot(500, lambda: self.splash.finish(self) if self.splash else print("[Splash] Already closed or missing"))
-        self.show()
 
         # Set initial view
         if hasattr(self, 'nav_button_group') and self.nav_button_group.buttons():
@@ -528,6 +2187,37 @@ class WasteDetectionApp(QWidget):
                     self.handle_navigation(self.nav_button_group.id(btn))
                     break
 
+    def on_tracker_loaded(self, tracker):
+        if tracker is not None and self.strongsort is None:
+            self.strongsort = tracker
+
+    def on_history_loaded(self, available):
+        """Switches an open History tab to the database; the session's records are already queued for it."""
+        if available and self.stacked_layout.currentIndex() == 2:
+            self.update_history_view()
+
+    def get_tracker(self):
+        """Returns the cached StrongSORT tracker, loading it now if the background load has not delivered one."""
+        if self.strongsort is None:
+            try:
+                self.strongsort = create_strongsort()
+            except Exception as e:
+                print(f"Error loading StrongSORT: {e}")
+                return None
+        return self.strongsort
+
+    def get_trackers(self, count):
+        """Returns `count` StrongSORT trackers, one per camera; the extra ones are loaded once and kept."""
+        if self.get_tracker() is None:
+            return None
+        while len(self.extra_trackers) < count - 1:
+            try:
+                self.extra_trackers.append(create_strongsort())
+            except Exception as e:
+                print(f"Error loading StrongSORT: {e}")
+                return None
+        return [self.strongsort] + self.extra_trackers[:count - 1]
+
     def initUI(self):
         overall_layout = QHBoxLayout(self)
         overall_layout.setContentsMargins(0, 0, 0, 0)
@@ -616,7 +2306,7 @@ class WasteDetectionApp(QWidget):
         if index == 1:
             self.update_analytics_view()
         elif index == 2:
-            self.update_history_view(page=1)  # Reset to page 1 on tab switch
+            self.update_history_view(flush=True)  # Back to the newest records on tab switch
 
     def create_header(self):
         header_widget = QWidget()
@@ -754,6 +2444,7 @@ class WasteDetectionApp(QWidget):
         webcam_layout.addLayout(webcam_title_layout)
         self.webcam_dropdown = QComboBox()
         self.webcam_dropdown.setToolTip("Select webcam device")
+        self.webcam_dropdown.addItem("Searching for webcams...", None)
         webcam_layout.addWidget(self.webcam_dropdown)
         play_icon = get_icon("webcam_play.svg",
                              QStyle.StandardPixmap.SP_MediaPlay)
@@ -764,6 +2455,36 @@ class WasteDetectionApp(QWidget):
         webcam_layout.addWidget(self.webcam_btn)
         left_panel_layout.addWidget(webcam_group)
 
+        # Video File Group
+        video_group = QWidget()
+        video_layout = QVBoxLayout(video_group)
+        video_layout.setContentsMargins(0, 0, 0, 0)
+        video_layout.setSpacing(8)
+        video_title = QLabel("Video File Input")
+        video_title.setObjectName("panelTitleLabel")
+        video_layout.addWidget(video_title)
+        video_options_layout = QHBoxLayout()
+        self.video_step_combo = QComboBox()
+        self.video_step_combo.setToolTip("Frames of the video to analyse")
+        for text, step in (("Every frame", 1), ("Every 2nd frame", 2), ("Every 5th frame", 5), ("Every 10th frame", 10)):
+            self.video_step_combo.addItem(text, step)
+        video_options_layout.addWidget(self.video_step_combo)
+        self.video_pacing_combo = QComboBox()
+        self.video_pacing_combo.setToolTip("Real-time plays the video at its own speed; otherwise frames are analysed as fast as possible")
+        self.video_pacing_combo.addItem("As fast as possible", False)
+        self.video_pacing_combo.addItem("Real-time", True)
+        video_options_layout.addWidget(self.video_pacing_combo)
+        video_layout.addLayout(video_options_layout)
+        self.video_btn = QPushButton(play_icon, " Analyze Video File")
+        self.video_btn.setObjectName("startWebcamButton")
+        self.video_btn.clicked.connect(self.toggle_video)
+        self.video_btn.setEnabled(False)
+        video_layout.addWidget(self.video_btn)
+        self.video_progress_label = QLabel("")
+        self.video_progress_label.setStyleSheet("font-size: 11px;")
+        video_layout.addWidget(self.video_progress_label)
+        left_panel_layout.addWidget(video_group)
+
         left_panel_layout.addStretch(1)
         overall_detection_layout.addWidget(left_panel)
 
@@ -960,9 +2681,10 @@ class WasteDetectionApp(QWidget):
                 self.confidence_threshold = value
                 # Optional: Re-format input field to always show 2 decimal places
                 self.conf_input.setText(f"{self.confidence_threshold:.2f}")
-                self.update_analytics_view()
+                if self.stacked_layout.currentIndex() == 1:  # Analytics
+                    self.update_analytics_view()
 
-                if hasattr(self, "current_image_path") and self.current_image_path:
+                if not self.refresh_current_detections() and getattr(self, "current_image_path", None):
                     self.run_model_on_image_path(self.current_image_path)
             else:
                 QMessageBox.warning(self, "Invalid Input", "Confidence Threshold must be between 0.0 and 1.0.")
@@ -978,8 +2700,9 @@ class WasteDetectionApp(QWidget):
                 self.iou_threshold = value
                 # Optional: Re-format input field to always show 2 decimal places
                 self.iou_input.setText(f"{self.iou_threshold:.2f}")
-                self.update_analytics_view()
-                if hasattr(self, "current_image_path") and self.current_image_path:
+                if self.stacked_layout.currentIndex() == 1:  # Analytics
+                    self.update_analytics_view()
+                if not self.refresh_current_detections() and getattr(self, "current_image_path", None):
                     self.run_model_on_image_path(self.current_image_path)
             else:
                 QMessageBox.warning(self, "Invalid Input", "IoU Threshold must be between 0.0 and 1.0.")
@@ -1010,7 +2733,7 @@ class WasteDetectionApp(QWidget):
         # ... (your existing logic for determining self.plastic_classes) ...
         # This part is fine:
         if self.model and hasattr(self.model, 'names'):
-            defined_plastics = ["PET", "HDPE", "PVC", "LDPE", "PP", "PS"]
+            defined_plastics = list(PLASTIC_CLASSES)
             model_plastic_names = []
             if isinstance(self.model.names, dict):
                 temp_names = sorted(list(self.model.names.values()))
@@ -1032,9 +2755,11 @@ class WasteDetectionApp(QWidget):
             self.plastic_classes = [f"Class_{i}" for i in range(min(6, len(
                 self.model.names if self.model and hasattr(self.model, 'names') else {})))]
         else:
-            self.plastic_classes = ["PET", "HDPE", "PVC", "LDPE", "PP", "PS"]
+            self.plastic_classes = list(PLASTIC_CLASSES)
             print(
                 "Warning: Model names not available for stat cards, using default plastic classes.")
+        self.class_resolver = PlasticClassResolver(
+            self.model.names if self.model and hasattr(self.model, 'names') else {}, self.plastic_classes)
         self.stat_cards = {}
         num_classes = len(self.plastic_classes)
 
@@ -1156,15 +2881,10 @@ class WasteDetectionApp(QWidget):
         chart_title.setObjectName("chartTitleLabel")
         chart_container_layout.addWidget(chart_title)
 
-        # Matplotlib Chart Integration
-        self.figure = Figure(figsize=(5, 4), dpi=100) # You can adjust figsize and dpi as needed
-        self.canvas = FigureCanvas(self.figure)
-        chart_container_layout.addWidget(self.canvas)
-
-        # Optional: Set transparent background for matplotlib figure and canvas for QSS to show through
-        # You might need to import `plt` at the top of your file for `plt.style.use` if not already
-        self.figure.patch.set_facecolor('none')
-        self.canvas.setStyleSheet("background-color: transparent;")
+        # Matplotlib Chart Integration; the canvas is created on first use by ensure_analytics_canvas()
+        self.chart_container_layout = chart_container_layout
+        self.figure = None
+        self.canvas = None
 
         main_layout.addWidget(self.chart_frame_container, 1) # Allow this container to take vertical space
 
@@ -1214,65 +2934,51 @@ class WasteDetectionApp(QWidget):
         self.history_search_timer = QTimer()
         self.history_search_timer.setSingleShot(True)
         self.history_search_timer.timeout.connect(
-            lambda: self.update_history_view(page=1))
+            lambda: self.update_history_view())
         self.history_search_input.textChanged.connect(
             lambda: self.history_search_timer.start(500))  # 500ms delay
         self.history_filter_combo = QComboBox()
         self.history_filter_combo.addItem("Filter by type: All")
         self.history_filter_combo.setFixedWidth(180)
         self.history_filter_combo.currentIndexChanged.connect(
-            lambda: self.update_history_view(page=1))
+            lambda: self.update_history_view())
         filter_bar_layout.addWidget(search_label)
         filter_bar_layout.addWidget(self.history_search_input, 1)  # Stretch
         filter_bar_layout.addWidget(self.history_filter_combo)
         main_layout.addLayout(filter_bar_layout)
 
-        # --- Gallery Area ---
-        self.history_scroll_area = QScrollArea()
-        self.history_scroll_area.setWidgetResizable(True)
-        self.history_scroll_area.setObjectName("galleryScrollArea")
-        self.history_scroll_area.setFrameShape(QFrame.Shape.NoFrame)
-        self.gallery_content_widget = QWidget()  # Container for the items
-   
-        # MODIFIED: Use FlowLayout instead of QGridLayout
-        self.gallery_flow_layout = FlowLayout(self.gallery_content_widget, margin=10, hSpacing=15, vSpacing=15)
-        # self.gallery_content_widget.setLayout(self.gallery_flow_layout) # This line is not needed as FlowLayout takes parent
-
-        self.history_scroll_area.setWidget(self.gallery_content_widget)
-        main_layout.addWidget(self.history_scroll_area, 1) # Stretch gallery
-
-        self.history_scroll_area.setWidget(self.gallery_content_widget)
-        main_layout.addWidget(self.history_scroll_area, 1) # Stretch gallery
-
-        # --- Pagination Controls ---
-        pagination_layout = QHBoxLayout()
-        pagination_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        pagination_layout.setSpacing(10)
-
-        prev_icon = get_icon("left-arrow.png",
-                             QStyle.StandardPixmap.SP_ArrowLeft)
-        self.history_prev_btn = QPushButton(prev_icon, " Previous")
-        self.history_prev_btn.setObjectName("paginationButton")
-        self.history_prev_btn.clicked.connect(self.history_prev_page)
-
-        self.history_page_label = QLabel("Page 1 / 1")
-        self.history_page_label.setObjectName("pageLabel")
-
-        next_icon = get_icon("right-arrow.png",
-                             QStyle.StandardPixmap.SP_ArrowRight)
-        self.history_next_btn = QPushButton("Next ") # Space for icon
-        self.history_next_btn.setIcon(next_icon)
-        # Icon on right
-        self.history_next_btn.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
-        self.history_next_btn.setObjectName("paginationButton")
-        self.history_next_btn.clicked.connect(self.history_next_page)
-
-        pagination_layout.addWidget(self.history_prev_btn)
-        pagination_layout.addStretch()
-        pagination_layout.addWidget(self.history_page_label)
-        pagination_layout.addStretch()
-        pagination_layout.addWidget(self.history_next_btn)
-        main_layout.addLayout(pagination_layout)
+        # --- Gallery Area (virtualized: only visible tiles are painted, records load while scrolling) ---
+        self.history_count_label = QLabel("")
+        self.history_count_label.setObjectName("pageLabel")
+        main_layout.addWidget(self.history_count_label)
+
+        self.history_empty_label = QLabel("No history recorded yet.")
+        self.history_empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.history_empty_label.setStyleSheet("color: #A0A7B9; font-size: 14px; margin-top: 20px;")
+        self.history_empty_label.hide()
+        main_layout.addWidget(self.history_empty_label)
+
+        self.history_model = HistoryGalleryModel(self)
+        self.history_delegate = GalleryTileDelegate(self.thumbnail_loader, self.gallery_summary, parent=self)
+        self.history_delegate.details_requested.connect(self.show_history_details)
+        self.thumbnail_loader.ready.connect(lambda path, pixmap, status: self.history_model.thumbnail_ready(path))
+
+        self.history_list_view = QListView()
+        self.history_list_view.setObjectName("galleryListView")
+        self.history_list_view.setViewMode(QListView.ViewMode.IconMode)
+        self.history_list_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.history_list_view.setMovement(QListView.Movement.Static)
+        self.history_list_view.setUniformItemSizes(True)  # Layout without asking every row for its size
+        self.history_list_view.setGridSize(QSize(THUMBNAIL_SIZE + 15, THUMBNAIL_SIZE + 65 + 15))
+        self.history_list_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.history_list_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.history_list_view.setFrameShape(QFrame.Shape.NoFrame)
+        self.history_list_view.setItemDelegate(self.history_delegate)
+        self.history_list_view.setModel(self.history_model)
+        # Thumbnails queued for tiles scrolled out of view are dropped; those on screen stay queued
+        self.history_list_view.verticalScrollBar().valueChanged.connect(
+            lambda: self.thumbnail_loader.cancel_pending(keep=self.visible_history_paths()))
+        main_layout.addWidget(self.history_list_view, 1) # Stretch gallery
 
         return history_widget
 
@@ -1744,8 +3450,7 @@ class WasteDetectionApp(QWidget):
         if not self.model:
             return
         files = [u.toLocalFile() for u in event.mimeData().urls()]
-        image_files = [f for f in files if f.lower().endswith(
-            ('.png', '.jpg', '.jpeg', '.bmp', '.webp'))]
+        image_files = [f for f in files if f.lower().endswith(IMAGE_EXTENSIONS)]
         if image_files:
             self.load_dropped_images(image_files)
 
@@ -1753,42 +3458,116 @@ class WasteDetectionApp(QWidget):
     def load_dropped_images(self, file_paths):
         if self.webcam_running:
             self.toggle_webcam()
+        if self.video_running:
+            self.stop_video()
         self.image_paths = file_paths
         self.current_image_index = -1
+        self.prefetched_images.clear()
         if self.image_paths:
             self.current_image_index = 0
             self.current_image_path = self.image_paths[0]  
             self.run_model_on_image_path(self.current_image_path)
+            self.schedule_prefetch()
+            self.start_batch_inference(self.image_paths[1:])
         self.update_navigation_buttons()
         self.update_image_count_label()
 
-    def update_webcam_list(self):
+    def start_batch_inference(self, file_paths):
+        """Processes the rest of a dropped/uploaded set in the background so navigation hits stored results."""
+        self.stop_batch_inference()
+        pending_paths = []
+        for path in dict.fromkeys(absolute_image_path(p) for p in file_paths):
+            if self.cached_result_key(path) not in self.result_cache:
+                pending_paths.append(path)
+        if not pending_paths:
+            return
+
+        self.batch_progress = (0, len(pending_paths))
+        self.batch_inference_thread = ImageInferenceThread(
+            self.model, self.model_lock, pending_paths, self.iou_threshold)
+        self.batch_inference_thread.results_ready.connect(self.on_batch_results_ready)
+        self.batch_inference_thread.progress.connect(self.on_batch_progress)
+        self.batch_inference_thread.start()
+
+    def stop_batch_inference(self):
+        if self.batch_inference_thread:
+            self.batch_inference_thread.stop()
+            self.batch_inference_thread.wait()
+            self.batch_inference_thread = None
+        self.batch_progress = None
+
+    def on_batch_results_ready(self, records):
+        for record in records:
+            self.add_background_file_record(record)
+
+    def cached_result_key(self, abs_path):
+        return DetectionResultCache.make_key(abs_path, self.model_key)
+
+    def add_background_file_record(self, record):
+        """Stores a result computed by the batch or prefetch threads in the cache and session history."""
+        key = self.cached_result_key(record['image_path'])
+        if key is None or key in self.result_cache:
+            return  # Already processed by navigation while the background work was running
+        self.result_cache.put(key, record['raw'], record['processing_time_ms'])
+        self.detection_history_memory.append(
+            'file', record['detections'], image_path=record['image_path'],
+            processing_time_ms=record['processing_time_ms'],
+            confidence_threshold=self.confidence_threshold,
+            iou_threshold=record['iou_threshold'], names=self.model.names)
+
+    def schedule_prefetch(self):
+        """Asks the prefetch thread to prepare the images around the current one."""
+        if not self.prefetch_thread or not self.image_paths or self.current_image_index < 0:
+            return
+        first = max(0, self.current_image_index - PREFETCH_BEHIND)
+        last = min(len(self.image_paths) - 1, self.current_image_index + PREFETCH_AHEAD)
+        # Nearest neighbours first, forward before backward
+        order = sorted(range(first, last + 1),
+                       key=lambda i: (abs(i - self.current_image_index), i < self.current_image_index))
+        paths = [absolute_image_path(self.image_paths[i]) for i in order if i != self.current_image_index]
+
+        infer_paths = [p for p in paths
+                       if self.cached_result_key(p) not in self.result_cache]
+        paths = [p for p in paths if p not in self.prefetched_images or p in infer_paths]
+        if paths:
+            self.prefetch_thread.request(paths, infer_paths, self.iou_threshold)
+
+    def on_image_prefetched(self, path, image, record):
+        self.prefetched_images[path] = image
+        self.prefetched_images.move_to_end(path)
+        while len(self.prefetched_images) > PREFETCH_AHEAD + PREFETCH_BEHIND + 1:
+            self.prefetched_images.popitem(last=False)
+        if record:
+            self.add_background_file_record(record)
+
+    def on_batch_progress(self, done, total):
+        self.batch_progress = (done, total) if done < total else None
+        self.update_image_count_label()
+
+    def update_webcam_list(self, available_cams):
+        """Fills the webcam dropdown from CameraEnumerationThread, keeping the current selection if still present."""
+        selected = self.webcam_dropdown.currentData()
         self.webcam_dropdown.clear()
-        available_cams = []
-        for i in range(5):  # Check first 5 indices
-            # Try DirectShow backend first (often better on Windows)
-            cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-            if cap.isOpened():
-                available_cams.append((f"Camera {i}", i))
-                cap.release()
-            else:  # Try default backend as fallback
-                cap = cv2.VideoCapture(i)
-                if cap.isOpened():
-                    available_cams.append((f"Camera {i} (Default)", i))
-                    cap.release()
 
         if available_cams:
             for name, idx in available_cams:
                 self.webcam_dropdown.addItem(name, idx)
-            if self.model and hasattr(self, 'webcam_btn'):
-                self.webcam_btn.setEnabled(True)
+            if len(available_cams) > 1:
+                # Tracks every camera at once, batching their frames through the model together
+                self.webcam_dropdown.addItem(f"All webcams ({len(available_cams)})",
+                                             [idx for _, idx in available_cams])
+            restored = self.webcam_dropdown.findData(selected)
+            if selected not in (None, -1) and restored != -1:
+                self.webcam_dropdown.setCurrentIndex(restored)
         else:
             self.webcam_dropdown.addItem("No webcams found", -1)
-            if hasattr(self, 'webcam_btn'):
-                self.webcam_btn.setEnabled(False)
+
+        # A running session owns the button (it is the stop button then)
+        if hasattr(self, 'webcam_btn') and not self.webcam_running and not self.video_running:
+            self.webcam_btn.setEnabled(self.model is not None and bool(available_cams))
 
     def update_navigation_buttons(self):
-        has_images = bool(self.image_paths) and not self.webcam_running
+        has_images = bool(self.image_paths) and not self.webcam_running and not self.video_running
         can_navigate = has_images and self.model is not None
 
         if hasattr(self, 'prev_btn'):
@@ -1799,9 +3578,11 @@ class WasteDetectionApp(QWidget):
                 can_navigate and self.current_image_index < len(self.image_paths) - 1)
 
     def update_image_count_label(self):
-        if self.image_paths and self.current_image_index != -1 and not self.webcam_running:
-            self.image_count_label.setText(
-                f"{self.current_image_index + 1} / {len(self.image_paths)}")
+        if self.image_paths and self.current_image_index != -1 and not self.webcam_running and not self.video_running:
+            label_text = f"{self.current_image_index + 1} / {len(self.image_paths)}"
+            if self.batch_progress:
+                label_text += f"  (analysing {self.batch_progress[0]}/{self.batch_progress[1]})"
+            self.image_count_label.setText(label_text)
         else:
             self.image_count_label.setText("— / —")
 
@@ -1812,6 +3593,8 @@ class WasteDetectionApp(QWidget):
             return
         if self.webcam_running:
             self.toggle_webcam()
+        if self.video_running:
+            self.stop_video()
 
         file_names, _ = QFileDialog.getOpenFileNames(
             self, "Select Images", "", "Images (*.png *.jpg *.jpeg *.bmp *.webp)")
@@ -1827,79 +3610,53 @@ class WasteDetectionApp(QWidget):
         try:
             confidence = self.confidence_threshold
             iou = self.iou_threshold
-            abs_file_path = os.path.abspath(file_path) if not os.path.isabs(file_path) else file_path
+            abs_file_path = absolute_image_path(file_path)
 
-            img_cv = cv2.imread(abs_file_path)
+            img_cv = self.prefetched_images.get(abs_file_path)
+            if img_cv is None:
+                img_cv = cv2.imread(abs_file_path)
             if img_cv is None:
                 self.image_label.setText(f"Error reading image\n{abs_file_path}")
                 self.original_pixmap = None
+                self.current_frame = None
                 self.display_scaled_image()
                 self.clear_detection_statistics_display()
                 return
 
-            # Check if this image is already in memory
-            existing_record = next((r for r in self.detection_history_memory if r['image_path'] == abs_file_path), None)
+            # Check if this image was already processed with the current model
+            cache_key = self.cached_result_key(abs_file_path)
+            existing_record = self.result_cache.get(cache_key)
 
             if existing_record:
-                # Use stored raw detections and processing time
-                current_detections = existing_record['detected_objects']
+                # Use stored raw predictions and processing time
+                raw = existing_record['raw']
                 proc_time_ms = existing_record['processing_time_ms']
+                keep = nms_indices(raw, iou)
             else:
                 start_time = time.time()
-                # Set conf to 0.01 to get ALL detections
-                results = self.model(img_cv, conf=0.01, iou=iou)
+                # Set conf to 0.01 to get ALL detections; NMS runs on our side so IoU edits are cheap
+                with self.model_lock:
+                    results = self.model(img_cv, conf=0.01, iou=RAW_NMS_IOU, max_det=RAW_MAX_DETECTIONS)
                 end_time = time.time()
                 proc_time_ms = (end_time - start_time) * 1000
 
-                current_detections = []
-                if results and results[0].boxes and self.model and hasattr(self.model, 'names'):
-                    for box in results[0].boxes:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        cls_id = int(box.cls[0])
-                        conf = float(box.conf[0])
-                        class_name = self.model.names.get(cls_id, f"Class_{cls_id}")
-                        current_detections.append({
-                            "class": class_name,
-                            "conf": round(conf, 4),
-                            "box": [x1, y1, x2, y2]
-                        })
+                raw = extract_detections(results[0] if results else None)
+                keep = nms_indices(raw, iou)
 
                 # Save unfiltered detections to memory
-                history_record = {
-                    "id": len(self.detection_history_memory) + 1,
-                    "timestamp": datetime.now(),
-                    "image_path": abs_file_path,
-                    "source_type": 'file',
-                    "processing_time_ms": proc_time_ms,
-                    "confidence_threshold": confidence,
-                    "iou_threshold": iou,
-                    "detected_objects": current_detections
-                }
-                self.detection_history_memory.append(history_record)
+                self.detection_history_memory.append(
+                    'file', raw[keep], image_path=abs_file_path, processing_time_ms=proc_time_ms,
+                    confidence_threshold=confidence, iou_threshold=iou, names=self.model.names)
+                self.result_cache.put(cache_key, raw, proc_time_ms)
                 self.update_detection_stats_card()
 
-            # Filter for display (apply current threshold)
-            display_detections = [
-                det for det in current_detections if det.get("conf", 0) >= self.confidence_threshold
-            ]
-
-            # Draw only filtered boxes
-            annotated_img = self.draw_custom_boxes_from_list(
-                img_cv.copy(), display_detections, os.path.basename(abs_file_path)
-            )
-
-            # Convert to QImage for display
-            annotated_img_rgb = cv2.cvtColor(annotated_img, cv2.COLOR_BGR2RGB)
-            h, w, ch = annotated_img_rgb.shape
-            bytes_per_line = ch * w
-            qt_img = QImage(annotated_img_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-            self.original_pixmap = QPixmap.fromImage(qt_img)
-
-            # Show image
-            self.display_scaled_image()
-
-            # Update UI stats from filtered detections
-            self.update_detection_statistics_from_list(display_detections, proc_time_ms)
+            self.current_frame = img_cv
+            self.current_raw = raw
+            self.current_keep = keep
+            self.current_keep_iou = iou
+            self.current_proc_time_ms = proc_time_ms
+            self.current_source_name = os.path.basename(abs_file_path)
+            self.render_current_detections()
 
         except Exception as e:
             self.image_label.setText(f"Error processing image:\n{str(e)}")
@@ -1910,41 +3667,69 @@ class WasteDetectionApp(QWidget):
             self.clear_detection_statistics_display()
 
 
+    def refresh_current_detections(self):
+        """Re-applies the thresholds to the image on screen from its cached frame and raw predictions.
+
+        Returns False when there is no such image (e.g. webcam mode).
+        """
+        if self.current_frame is None or self.current_raw is None:
+            return False
+        try:
+            if self.current_keep_iou != self.iou_threshold:
+                self.current_keep = nms_indices(self.current_raw, self.iou_threshold)
+                self.current_keep_iou = self.iou_threshold
+            self.render_current_detections()
+        except Exception as e:
+            print(f"Error refreshing detections: {e}")
+            return False
+        return True
+
+    def render_current_detections(self):
+        """Draws the current image's detections above the confidence threshold and updates the stats."""
+        kept = self.current_raw[self.current_keep]
+        display_detections = detections_to_dicts(
+            kept[kept["conf"] >= self.confidence_threshold], self.model.names)
+
+        # Draw only filtered boxes (annotate_detections works on its own copy)
+        annotated_img = self.draw_custom_boxes_from_list(
+            self.current_frame, display_detections, self.current_source_name
+        )
+
+        # Convert to QImage for display
+        annotated_img_rgb = cv2.cvtColor(annotated_img, cv2.COLOR_BGR2RGB)
+        h, w, ch = annotated_img_rgb.shape
+        bytes_per_line = ch * w
+        qt_img = QImage(annotated_img_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+        self.original_pixmap = QPixmap.fromImage(qt_img)
+
+        # Show image
+        self.display_scaled_image()
+
+        # Update UI stats from filtered detections
+        self.update_detection_statistics_from_list(display_detections, self.current_proc_time_ms)
+
     # --- Drawing and Statistics ---
     def draw_custom_boxes_from_list(self, image, detections_list, source_filename="image"):
         """Draws boxes and updates latest_detection_details. Now handles optional track_id."""
+        annotated_image, self.latest_detection_details = self.annotate_detections(
+            image, detections_list, source_filename)
+        return annotated_image
+
+    def annotate_detections(self, image, detections_list, source_filename="image"):
+        """Draws boxes on a copy of image; returns (annotated_image, export_rows).
+
+        Touches no widget state, so the tracking worker can call it off the GUI thread.
+        """
         img_h, img_w = image.shape[:2]
-        class_colors = {
-            "PET": (0, 255, 255),   # Yellow (B=0, G=255, R=255)
-            "HDPE": (0, 165, 255),  # Orange (B=0, G=165, R=255)
-            "LDPE": (0, 255, 0),    # Green  (B=0, G=255, R=0)
-            "PVC": (0, 0, 255),     # Red    (B=0, G=0, R=255)
-            "PP": (128, 128, 128),  # Gray   (B=128, G=128, R=128)
-            "PS": (128, 0, 128),    # Purple (B=128, G=0, R=128)
-        }
-        default_color = (200, 200, 200)
+        resolver = self.class_resolver
         annotated_image = image.copy()
         export_data_for_current_image = []
 
         for i, det in enumerate(detections_list):
             x1, y1, x2, y2 = det['box']
-            model_class_name_raw = det['class']
             conf = det['conf']
             track_id = det.get('track_id') # Get track_id if it exists
-            
-            display_class_name = model_class_name_raw  # Default
-            color = default_color
-
-            if display_class_name in ["PET", "HDPE", "LDPE"]:
-                font_color = (0, 0, 0)  # Black font for these classes
-            else:
-                font_color = (255, 255, 255)
-            # Match standard abbreviations
-            for target_class in self.plastic_classes:
-                if target_class.lower() in model_class_name_raw.lower():
-                    display_class_name = target_class
-                    color = class_colors.get(target_class, default_color)
-                    break
+            display_class_name, _, color, font_color = resolver.resolve(det)
             
             export_obj = {
                 "image_source": source_filename, "object_id": i + 1,
@@ -1998,9 +3783,7 @@ class WasteDetectionApp(QWidget):
                         cv2.FONT_HERSHEY_SIMPLEX, font_scale, font_color, thickness, cv2.LINE_AA)
             
 
-        # Update instance variable for export
-        self.latest_detection_details = export_data_for_current_image
-        return annotated_image
+        return annotated_image, export_data_for_current_image
 
     def clear_detection_statistics_display(self):
         if not hasattr(self, 'stat_cards') or not self.stat_cards:
@@ -2029,6 +3812,8 @@ class WasteDetectionApp(QWidget):
         """Clears only the current detection display, not history."""
         self.clear_detection_statistics_display()
         self.original_pixmap = None
+        self.current_frame = None
+        self.current_raw = None
         if hasattr(self, 'image_label'):
             self.image_label.clear()
             self.image_label.setText("Upload image or start webcam...")
@@ -2037,21 +3822,24 @@ class WasteDetectionApp(QWidget):
         print("Current detection display cleared.")
 
     def clear_all_history(self):
-        """Clears the in-memory history and updates relevant views."""
+        """Clears the history (in memory and on disk) and updates relevant views."""
         reply = QMessageBox.question(self, 'Clear History',
-                                     "Clear all detection history for this session?\nThis cannot be undone.",
+                                     "Clear all saved detection history?\nThis cannot be undone.",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                      QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.detection_history_memory = []
+            self.detection_history_memory.clear()
+            self.history_store.clear()
+            self.result_cache.clear()
+            self.thumbnail_loader.clear()
             self.latest_detection_details = []  # Clear current view details too
-            print("In-memory history cleared.")
+            print("Detection history cleared.")
             # Update views if they are currently active
             if self.stacked_layout.currentIndex() == 1:  # Analytics
                 self.update_analytics_view()
             if self.stacked_layout.currentIndex() == 2:  # History
-                self.update_history_view(page=1)
+                self.update_history_view(flush=True)
             # Also clear current detection display
             self.clear_current_detection_display()
 
@@ -2073,12 +3861,10 @@ class WasteDetectionApp(QWidget):
         total_detections = len(detections_list)
 
         for det in detections_list:
-            model_class_name_raw = det['class'].lower()
-            # Match against the defined plastic classes
-            for target_class_name in self.plastic_classes:
-                if target_class_name.lower() in model_class_name_raw:
-                    counts[target_class_name] += 1
-                    break  # Count only the first match
+            # Count under the first matching plastic class
+            plastic = self.class_resolver.resolve(det)[1]
+            if plastic is not None:
+                counts[plastic] += 1
 
         # Update class cards
         for class_name, count in counts.items():
@@ -2138,6 +3924,7 @@ class WasteDetectionApp(QWidget):
             self.current_image_index -= 1
             self.current_image_path = self.image_paths[self.current_image_index]  
             self.run_model_on_image_path(self.current_image_path)
+            self.schedule_prefetch()
             self.update_navigation_buttons()
             self.update_image_count_label()
 
@@ -2148,29 +3935,19 @@ class WasteDetectionApp(QWidget):
             self.current_image_index += 1
             self.current_image_path = self.image_paths[self.current_image_index]  
             self.run_model_on_image_path(self.current_image_path)
+            self.schedule_prefetch()
             self.update_navigation_buttons()
             self.update_image_count_label()
 
     # --- Webcam Handling ---
     def toggle_webcam(self):
-        checkpoint_path = resource_path("Yolov7_StrongSORT_OSNet/strong_sort/deep/checkpoint/osnet_x0_25_market1501.pt")
-
-        self.strongsort = StrongSORT(
-            model_weights=checkpoint_path,
-            device='cuda' if torch.cuda.is_available() else 'cpu',
-            fp16=False
-        )
         if not self.model:
             self.image_label.setText("Model not loaded.")
             return
 
         if self.webcam_running:
             self.webcam_running = False
-            if hasattr(self, 'webcam_timer') and self.webcam_timer:
-                self.webcam_timer.stop()
-            if hasattr(self, 'cap') and self.cap and self.cap.isOpened():
-                self.cap.release()
-            self.cap = None # Ensure it's cleared
+            self.stop_tracking_pipeline()
 
             play_icon = get_icon("webcam_play.svg",
                                  QStyle.StandardPixmap.SP_MediaPlay)
@@ -2194,37 +3971,56 @@ class WasteDetectionApp(QWidget):
             # self.clear_current_detection_display()
 
         else:  # Start webcam
+            if self.video_running:
+                self.stop_video()
             webcam_idx = self.webcam_dropdown.currentData()
             if webcam_idx is None or webcam_idx == -1:
                 self.image_label.setText("No webcam selected.")
                 return
+            # The "All webcams" entry carries a list of camera indices
+            webcam_indices = webcam_idx if isinstance(webcam_idx, list) else [webcam_idx]
+
+            trackers = self.get_trackers(len(webcam_indices))
+            if trackers is None:
+                self.image_label.setText("Tracker not loaded.")
+                return
+            for tracker in trackers:
+                reset_strongsort(tracker)  # Fresh track IDs without reloading the re-ID weights
 
             # Clear previous state
+            self.stop_batch_inference()
             self.image_paths = []
             self.current_image_index = -1
             self.update_image_count_label()
             self.update_navigation_buttons()
             self.clear_current_detection_display() # Clear stats/image
 
-            # --- MODIFIED: Reset webcam tracking state on start ---
-            self.tracked_object_identities = {}
-
-            # Try opening webcam
-            self.cap = cv2.VideoCapture(webcam_idx, cv2.CAP_DSHOW)
-            if not self.cap or not self.cap.isOpened():
-                print(
-                    f"Warning: DSHOW failed for webcam {webcam_idx}, trying default.")
-                self.cap = cv2.VideoCapture(webcam_idx)
-                if not self.cap or not self.cap.isOpened():
+            # Try opening every selected webcam
+            caps = []
+            for idx in webcam_indices:
+                cap = self.open_webcam(idx)
+                if cap is None:
+                    for opened in caps:
+                        opened.release()
                     self.image_label.setText(
-                        f"Error opening webcam {webcam_idx}")
-                    self.cap = None
+                        f"Error opening webcam {idx}")
                     return
+                caps.append(cap)
+
+            # One buffer per camera, all sharing a condition so the worker can wait on them together
+            condition = threading.Condition()
+            capture_threads, sessions = [], []
+            multi_camera = len(caps) > 1
+            for idx, cap, tracker in zip(webcam_indices, caps, trackers):
+                frame_buffer = FrameBuffer(WEBCAM_FRAME_BUFFER_SIZE, condition, latest_only=True)
+                capture_threads.append(WebcamCaptureThread(cap, frame_buffer))
+                sessions.append(TrackingSession(
+                    f"Camera {idx}", tracker, frame_buffer,
+                    f"camera{idx}_tracked_frame" if multi_camera else "webcam_tracked_frame",
+                    f"webcam{idx}_tracked" if multi_camera else "webcam_tracked"))
 
             self.webcam_running = True
-            self.webcam_timer = QTimer(self)
-            self.webcam_timer.timeout.connect(self.update_webcam_frame)
-            self.webcam_timer.start(30)  # Target ~30 FPS for smoother tracking
+            self.start_tracking_pipeline(capture_threads, sessions)
 
             stop_icon = get_icon("webcam_stop.svg",
                                  QStyle.StandardPixmap.SP_MediaStop)
@@ -2240,138 +4036,192 @@ class WasteDetectionApp(QWidget):
             self.webcam_dropdown.setEnabled(False)
             self.drop_frame.setEnabled(False)
 
-    def update_webcam_frame(self):
-        """Processes a webcam frame using StrongSORT tracking and handles cases with no detections smoothly."""
-        if not self.webcam_running or not hasattr(self, 'cap') or not self.cap or not self.cap.isOpened():
-            if self.webcam_running:
-                print("Webcam stream lost or unavailable.")
-                self.toggle_webcam()
+    def open_webcam(self, webcam_idx):
+        """Opens a webcam, preferring DirectShow on Windows; returns None if no backend can open it."""
+        if sys.platform == "win32":
+            cap = cv2.VideoCapture(webcam_idx, cv2.CAP_DSHOW)
+            if cap and cap.isOpened():
+                return cap
+            cap.release()
+            print(
+                f"Warning: DSHOW failed for webcam {webcam_idx}, trying default.")
+        cap = cv2.VideoCapture(webcam_idx)  # Default backend
+        if not cap or not cap.isOpened():
+            return None
+        return cap
+
+    def start_tracking_pipeline(self, capture_threads, sessions):
+        """Starts the capture threads (webcams or a video file) and one tracking worker serving all sessions."""
+        self.capture_threads = capture_threads
+        for capture_thread in capture_threads:
+            if isinstance(capture_thread, WebcamCaptureThread):
+                capture_thread.stream_lost.connect(self.on_webcam_stream_lost)
+        self.tracking_worker = TrackingWorker(
+            self.model, sessions, self.model_lock,
+            lambda: (self.confidence_threshold, self.iou_threshold),
+            self.annotate_detections)
+        self.tracking_worker.frame_ready.connect(self.on_tracking_frame_ready)
+        self.tracking_worker.finished.connect(self.on_tracking_worker_finished)
+        self.tracking_worker.start()
+        for capture_thread in self.capture_threads:
+            capture_thread.start()
+
+    def stop_tracking_pipeline(self):
+        """Stops the capture/tracking threads and releases the cameras or video file."""
+        for capture_thread in self.capture_threads:
+            capture_thread.stop()
+        if self.tracking_worker:
+            self.tracking_worker.stop()
+        for capture_thread in self.capture_threads:
+            capture_thread.wait()
+        if self.tracking_worker:
+            self.tracking_worker.wait()
+        for capture_thread in self.capture_threads:
+            if capture_thread.cap.isOpened():
+                capture_thread.cap.release()
+        self.capture_threads = []
+        self.tracking_worker = None
+
+    def on_webcam_stream_lost(self):
+        if self.webcam_running:
+            self.toggle_webcam()
+
+    def on_tracking_worker_finished(self):
+        """The worker exits on its own once a video file's frames are exhausted."""
+        if self.video_running and self.sender() is self.tracking_worker:
+            self.stop_video(finished=True)
+
+    def toggle_video(self):
+        if self.video_running:
+            self.stop_video()
+            return
+        if not self.model:
+            self.image_label.setText("Model not loaded.")
             return
 
-        ret, frame = self.cap.read()
-        if not ret or frame is None:
-            print("Failed to grab frame from webcam.")
+        video_path, _ = QFileDialog.getOpenFileName(
+            self, "Select Video", "", "Videos (*.mp4 *.avi *.mov *.mkv *.m4v)")
+        if not video_path:
             return
 
-        try:
-            confidence = self.confidence_threshold
-            iou = self.iou_threshold
+        tracker = self.get_tracker()
+        if tracker is None:
+            self.image_label.setText("Tracker not loaded.")
+            return
 
-            start_time = time.time()
-            results = self.model.predict(frame, conf=confidence, iou=iou)[0]
-            end_time = time.time()
-            proc_time_ms = (end_time - start_time) * 1000
-
-            tracks = np.empty((0, 7))
-            current_detections_for_display = []
-            newly_detected_objects_for_history = []
-
-            if results.boxes and results.boxes.xyxy.numel() > 0:
-                boxes_xyxy = results.boxes.xyxy.detach().cpu().numpy()
-                confs = results.boxes.conf.detach().cpu().numpy()
-                class_ids = results.boxes.cls.detach().cpu().numpy().astype(int)
-
-                bbox_xywh = []
-                for x1, y1, x2, y2 in boxes_xyxy:
-                    xc = (x1 + x2) / 2
-                    yc = (y1 + y2) / 2
-                    w = x2 - x1
-                    h = y2 - y1
-                    bbox_xywh.append([xc, yc, w, h])
-                bbox_xywh = np.array(bbox_xywh)
-
-                tracks = self.strongsort.update(bbox_xywh, confs, class_ids, frame)
-            else:
-                self.strongsort.increment_ages()
+        if self.webcam_running:
+            self.toggle_webcam()
+        self.stop_batch_inference()
 
-            # PRUNE old track identities if needed
-            current_ids = set(track[4] for track in tracks) if len(tracks) else set()
-            self.tracked_object_identities = {
-                tid: name for tid, name in self.tracked_object_identities.items() if tid in current_ids
-            }
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            self.image_label.setText(f"Error opening video\n{video_path}")
+            return
+        reset_strongsort(tracker)  # Fresh track IDs without reloading the re-ID weights
 
-            for track in tracks:
-                x1, y1, x2, y2 = map(int, track[:4])
-                track_id = int(track[4])
-                class_id = int(track[5])
-                conf = float(track[6])
+        # Clear previous state
+        self.image_paths = []
+        self.current_image_index = -1
+        self.update_image_count_label()
+        self.update_navigation_buttons()
+        self.clear_current_detection_display()
+
+        self.video_path = absolute_image_path(video_path)
+        self.video_started_at = time.time()
+        self.video_frames_read = 0
+        self.last_video_display_time = 0
+        self.video_running = True
+        realtime = self.video_pacing_combo.currentData()
+        # Real-time playback must not fall behind the clock; analysis keeps a queue so no frame is lost
+        frame_buffer = FrameBuffer(1, latest_only=True) if realtime else FrameBuffer(VIDEO_FRAME_BUFFER_SIZE)
+        capture_thread = VideoFileCaptureThread(
+            cap, frame_buffer,
+            frame_step=self.video_step_combo.currentData(),
+            realtime=realtime)
+        capture_thread.progress.connect(self.on_video_progress)
+        self.start_tracking_pipeline(
+            [capture_thread], [TrackingSession(os.path.basename(self.video_path), tracker, frame_buffer,
+                                               history_source="video_tracked")])
+
+        stop_icon = get_icon("webcam_stop.svg", QStyle.StandardPixmap.SP_MediaStop)
+        self.video_btn.setText(" Stop Video Analysis")
+        self.video_btn.setIcon(stop_icon)
+        self.video_btn.setObjectName("stopWebcamButton")
+        self.video_btn.setStyleSheet(self.styleSheet())
+        self.video_progress_label.setText(f"Analysing {os.path.basename(self.video_path)}...")
+        self.latest_detection_details = []
+        self.video_step_combo.setEnabled(False)
+        self.video_pacing_combo.setEnabled(False)
+        self.webcam_btn.setEnabled(False)
+        self.drop_frame.setEnabled(False)
+
+    def stop_video(self, finished=False):
+        if not self.video_running:
+            return
+        self.video_running = False
+        self.stop_tracking_pipeline()
+
+        elapsed = max(time.time() - self.video_started_at, 1e-6)
+        status = "Finished" if finished else "Stopped"
+        self.video_progress_label.setText(
+            f"{status}: {self.video_frames_read} frames in {elapsed:.1f}s "
+            f"({self.video_frames_read / elapsed:.1f} frames/s)")
+        print(f"Video analysis {status.lower()}: {self.video_path}")
+
+        play_icon = get_icon("webcam_play.svg", QStyle.StandardPixmap.SP_MediaPlay)
+        self.video_btn.setText(" Analyze Video File")
+        self.video_btn.setIcon(play_icon)
+        self.video_btn.setObjectName("startWebcamButton")
+        self.video_btn.setStyleSheet(self.styleSheet())
+        self.video_step_combo.setEnabled(True)
+        self.video_pacing_combo.setEnabled(True)
+        self.webcam_btn.setEnabled(self.webcam_dropdown.currentData() not in (None, -1))
+        self.drop_frame.setEnabled(True)
+        self.update_navigation_buttons()
+        self.update_image_count_label()
 
-                current_class_name = self.model.names.get(class_id, f"Class_{class_id}")
-                display_class_name = ""
+    def on_video_progress(self, frames_read, total_frames):
+        if not self.video_running:
+            return
+        self.video_frames_read = frames_read
+        elapsed = max(time.time() - self.video_started_at, 1e-6)
+        total_text = f" / {total_frames}" if total_frames else ""
+        self.video_progress_label.setText(
+            f"Frame {frames_read}{total_text} ({frames_read / elapsed:.1f} frames/s)")
 
-                if track_id in self.tracked_object_identities:
-                    display_class_name = self.tracked_object_identities[track_id]
-                else:
-                    display_class_name = current_class_name
-                    self.tracked_object_identities[track_id] = display_class_name
-                    print(f"New object tracked: ID {track_id} as {display_class_name}")
-                    newly_detected_objects_for_history.append({
-                        "class": display_class_name, "conf": round(conf, 4), "box": [x1, y1, x2, y2]
-                    })
-
-                if hasattr(self, 'locked_ids') and track_id in self.locked_ids:
-                    print(f">>> LOCKED OBJECT {track_id} is on screen at {[x1, y1, x2, y2]}")
-
-                current_detections_for_display.append({
-                    "class": display_class_name,
-                    "conf": round(conf, 4),
-                    "box": [x1, y1, x2, y2],
-                    "track_id": track_id
-                })
-
-            if newly_detected_objects_for_history:
-                history_record = {
-                    "id": len(self.detection_history_memory) + 1,
-                    "timestamp": datetime.now(),
-                    "image_path": None,
-                    "source_type": 'webcam_tracked',
-                    "processing_time_ms": proc_time_ms,
-                    "confidence_threshold": confidence,
-                    "iou_threshold": iou,
-                    "detected_objects": newly_detected_objects_for_history
-                }
-                self.detection_history_memory.append(history_record)
-
-            # Always draw — even if no tracks
-            if len(current_detections_for_display) == 0:
-                annotated_frame = frame.copy()
-                text = "No plastics detected"
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                text_scale = 1.0
-                text_thickness = 2
-                text_size = cv2.getTextSize(text, font, text_scale, text_thickness)[0]
-                text_x = int((annotated_frame.shape[1] - text_size[0]) / 2)
-                text_y = 50
-
-                cv2.putText(
-                    annotated_frame,
-                    text,
-                    (text_x, text_y),
-                    font,
-                    text_scale,
-                    (0, 0, 255),   # Red text
-                    text_thickness,
-                    cv2.LINE_AA
-                )
-            else:
-                annotated_frame = self.draw_custom_boxes_from_list(
-                    frame.copy(), current_detections_for_display, "webcam_tracked_frame")
-
-            # Convert for Qt display
-            annotated_frame_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = annotated_frame_rgb.shape
-            bytes_per_line = ch * w
-            qt_img = QImage(annotated_frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-            self.original_pixmap = QPixmap.fromImage(qt_img)
+    def on_tracking_frame_ready(self, result):
+        """Displays a frame finished by the TrackingWorker and records newly tracked objects."""
+        if not self.webcam_running and not self.video_running:
+            return  # Late frame from a stopped session
+
+        try:
+            # One history record per camera that saw new objects in this batch
+            for session, new_objects in result["new_objects"]:
+                if not len(new_objects):
+                    continue
+                self.detection_history_memory.append(
+                    session.history_source, new_objects,
+                    image_path=self.video_path if self.video_running else None,
+                    processing_time_ms=result["frame_processing_time_ms"],
+                    confidence_threshold=result["confidence_threshold"],
+                    iou_threshold=result["iou_threshold"], names=self.model.names)
+
+            if self.video_running:
+                # Unpaced video can finish frames faster than the screen needs them
+                now = time.time()
+                if now - self.last_video_display_time < 1 / VIDEO_DISPLAY_MAX_FPS:
+                    return
+                self.last_video_display_time = now
+
+            self.latest_detection_details = result["export_rows"]
+            self.original_pixmap = QPixmap.fromImage(result["image"])
             self.display_scaled_image()
 
             # Update stats
-            self.update_detection_statistics_from_list(current_detections_for_display, proc_time_ms)
+            self.update_detection_statistics_from_list(result["detections"], result["processing_time_ms"])
 
         except Exception as e:
-            print(f"Error processing webcam frame: {e}")
-
-
+            print(f"Error displaying webcam frame: {e}")
 
     # --- Export ---
     def export_statistics(self):
@@ -2408,6 +4258,8 @@ class WasteDetectionApp(QWidget):
         source_info = "last_view"  # Default name
         if self.webcam_running:
             source_info = "webcam_capture"
+        elif self.video_running:
+            source_info = os.path.splitext(os.path.basename(self.video_path))[0]
         elif self.image_paths and self.current_image_index != -1:
             try:
                 source_info = os.path.splitext(os.path.basename(
@@ -2502,15 +4354,18 @@ class WasteDetectionApp(QWidget):
     def closeEvent(self, event):
         if self.webcam_running:
             self.toggle_webcam() # Stop webcam if running
-
-        if hasattr(self, 'model_thread') and self.model_thread.isRunning():
-            print("Waiting for model loading thread...")
-            self.model_thread.quit()
-            self.model_thread.wait(3000) # Wait 3 seconds
-            if self.model_thread.isRunning():
-                print("Model thread did not quit gracefully, terminating.")
-                self.model_thread.terminate()
-                self.model_thread.wait()
+        if self.video_running:
+            self.stop_video()
+        self.stop_batch_inference()
+        if self.prefetch_thread:
+            self.prefetch_thread.stop()
+            self.prefetch_thread.wait()
+
+        self.startup.stop()
+        # Queued history records are committed before the database is closed
+        self.history_store.stop()
+        self.history_store.wait()
+        self.thumbnail_loader.stop()
 
         print("Application closing.")
         # Stop timers
@@ -2520,8 +4375,24 @@ class WasteDetectionApp(QWidget):
         event.accept()
 
     # --- Methods for Analytics (No Charts) ---
+    def ensure_analytics_canvas(self):
+        """Creates the matplotlib figure/canvas the first time analytics are drawn (matplotlib loads lazily)."""
+        if self.canvas is not None:
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+
+        self.figure = Figure(figsize=(5, 4), dpi=100) # You can adjust figsize and dpi as needed
+        self.canvas = FigureCanvas(self.figure)
+        self.chart_container_layout.addWidget(self.canvas)
+
+        # Optional: Set transparent background for matplotlib figure and canvas for QSS to show through
+        self.figure.patch.set_facecolor('none')
+        self.canvas.setStyleSheet("background-color: transparent;")
+
     def update_analytics_view(self):
-        """Queries in-memory history and updates analytics cards and the chart."""
+        """Queries in-memory history and updates analytics cards and the charts."""
+        self.ensure_analytics_canvas()
         if not self.model:
             # Clear chart if model is not available
             self.figure.clear()
@@ -2537,10 +4408,6 @@ class WasteDetectionApp(QWidget):
         filtered_history = self.detection_history_memory
 
         # Calculate Aggregates
-        total_items_overall = 0
-        total_proc_time = 0
-        all_confidences = []
-        class_counts = Counter()
         num_records = len(filtered_history) # Number of processed frames/images
 
         if not filtered_history:
@@ -2562,45 +4429,23 @@ class WasteDetectionApp(QWidget):
             self.canvas.draw()
             return
 
-        # Use the current confidence threshold
+        # Use the current confidence threshold; the running aggregates answer it without a pass over objects
         current_threshold = self.confidence_threshold
+        aggregates = filtered_history.aggregates
+        counts_per_class = aggregates.class_counts(current_threshold)
+        total_items_overall = int(counts_per_class.sum())
+        total_confidence = aggregates.confidence_sum(current_threshold)
 
-        for record in filtered_history:
-            filtered_detections = [
-                det for det in record['detected_objects']
-                if det.get('conf', 0) >= current_threshold
-            ]
-
-            total_items_overall += len(filtered_detections)
-            total_proc_time += record.get('processing_time_ms', 0)
-
-            for det in filtered_detections:
-                conf = det.get('conf', 0)
-                all_confidences.append(conf)
-
-                model_class_name_raw = det.get('class', '').lower()
-                matched_class = None
-
-                # Try to match with model class
-                for class_id, class_name in self.model.names.items():
-                    if class_name.lower() == model_class_name_raw:
-                        matched_class = class_name
-                        break
-
-                # Fallback: match against known plastic classes
-                if not matched_class:
-                    for target_class_name in self.plastic_classes:
-                        if target_class_name.lower() in model_class_name_raw:
-                            matched_class = target_class_name
-                            break
-
-                class_counts[matched_class if matched_class else det.get('class', 'Unknown')] += 1
-
+        # Fold per-class counts into display labels
+        class_counts = Counter()
+        for class_id, count in enumerate(counts_per_class.tolist()):
+            if not count:
+                continue
+            class_counts[self.class_resolver.analytics_label(filtered_history.class_names[class_id])] += count
 
         # Calculate Averages and Most Frequent
-        avg_proc_time = (total_proc_time / num_records) if num_records else 0
-        avg_conf = (sum(all_confidences) / len(all_confidences)
-                            ) * 100 if all_confidences else 0
+        avg_proc_time = aggregates.average_processing_time
+        avg_conf = (total_confidence / total_items_overall) * 100 if total_items_overall else 0
         most_frequent = class_counts.most_common(1)
         most_frequent_class_str = f"{most_frequent[0][0]} ({most_frequent[0][1]})" if most_frequent else "N/A"
 
@@ -2613,7 +4458,8 @@ class WasteDetectionApp(QWidget):
 
         # --- Update Chart ---
         self.figure.clear() # Clear the previous plot
-        ax = self.figure.add_subplot(111)
+        ax = self.figure.add_subplot(121)
+        self.draw_confidence_distribution(self.figure.add_subplot(122), aggregates, current_threshold)
 
         # Prepare data for the chart
         labels = list(class_counts.keys())
@@ -2660,176 +4506,87 @@ class WasteDetectionApp(QWidget):
 
         self.canvas.draw() # Redraw the canvas with the new plot
 
-    # --- Methods for History/Gallery (Using Memory) ---
-    def update_history_view(self, page=None):
-        if page is None:
-            page = self.current_history_page
-
-        # Clear previous items
-        while self.gallery_flow_layout.count():
-            item = self.gallery_flow_layout.takeAt(0) # FlowLayout's takeAt
-            widget = item.widget()
-            if widget:
-                # No need to call layout.removeWidget(widget) with FlowLayout's takeAt
-                widget.deleteLater()
-
+    def draw_confidence_distribution(self, ax, aggregates, threshold):
+        """Bar chart of object confidences in 0.1 bins from the running histogram; bins below the threshold greyed."""
+        histogram = aggregates.confidence_histogram()
+        bins = histogram[:100].reshape(10, 10).sum(axis=1)
+        bins[-1] += histogram[100]  # Confidence of exactly 1.0 goes in the top bin
+        edges = np.arange(10) / 10
+        colors = ["#4A90D9" if edge + 0.1 > threshold else "#CCCCCC" for edge in edges]
+        ax.bar(edges, bins, width=0.1, align='edge', color=colors, edgecolor='white')
+        ax.axvline(threshold, color='black', linestyle='--', linewidth=1)
+        ax.set_xlim(0, 1)
+        ax.set_xlabel("Confidence", color='black')
+        ax.set_ylabel("Objects", color='black')
+        ax.set_title("Confidence Distribution", fontsize=14, color='black')
+
+    # --- Methods for History/Gallery ---
+    def update_history_view(self, flush=False):
+        """Restarts the gallery on the current filters; further records load as the view scrolls.
+
+        With flush (opening the tab, clearing) it first waits briefly for queued records to be
+        committed; filter changes only query what the writer has committed so typing never blocks.
+        """
         # Get filter values
         search_term = self.history_search_input.text().strip().lower()
         filter_type_full = self.history_filter_combo.currentText()
 
-        # Filter the in-memory list
-        filtered_data = []
-        for record in self.detection_history_memory:
-            # Type Filter
-            if filter_type_full.startswith("Filter by type:") and filter_type_full != "Filter by type: All":
-                class_name_filter = filter_type_full.split(": ")[1].lower()
-                found_class = any(class_name_filter in det.get('class', '').lower(
-                ) for det in record['detected_objects'])
-                if not found_class:
-                    continue
-            # Search Term Filter
-            if search_term:
-                path_match = record['image_path'] and search_term in record['image_path'].lower()
-                class_match = any(search_term in det.get(
-                    'class', '').lower() for det in record['detected_objects'])
-                if not (path_match or class_match):
-                    continue
-            # If passes all filters
-            filtered_data.append(record)
-
-        # Sort (newest first)
-        filtered_data.sort(key=lambda x: x['timestamp'], reverse=True)
-
-        # Paginate
-        total_items = len(filtered_data)
-        self.total_history_pages = (
-            total_items + HISTORY_ITEMS_PER_PAGE - 1) // HISTORY_ITEMS_PER_PAGE
-        if self.total_history_pages == 0:
-            self.total_history_pages = 1
-        self.current_history_page = max(1, min(page, self.total_history_pages))
-        start_index = (self.current_history_page - 1) * HISTORY_ITEMS_PER_PAGE
-        end_index = start_index + HISTORY_ITEMS_PER_PAGE
-        paginated_data = filtered_data[start_index:end_index]
-
-        # Populate grid
-        if not paginated_data:
-            no_history_label = QLabel("No history items match filters." if self.detection_history_memory else "No history recorded yet.")
-            no_history_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            no_history_label.setStyleSheet("color: #A0A7B9; font-size: 14px; margin-top: 20px;")
-            self.gallery_flow_layout.addWidget(no_history_label) # Add directly
-        else:
-            for record in paginated_data:
-                item_widget = self.create_gallery_item_widget(record)
-                if item_widget:
-                    self.gallery_flow_layout.addWidget(item_widget)
-
-        # Update pagination controls
-        self.history_page_label.setText(
-            f"Page {self.current_history_page} / {self.total_history_pages}")
-        self.history_prev_btn.setEnabled(self.current_history_page > 1)
-        self.history_next_btn.setEnabled(
-            self.current_history_page < self.total_history_pages)
+        class_name_filter = None
+        if filter_type_full.startswith("Filter by type:") and filter_type_full != "Filter by type: All":
+            class_name_filter = filter_type_full.split(": ")[1].lower()
 
-        # Scroll to top after update
-        self.history_scroll_area.verticalScrollBar().setValue(0)
+        # Query the indexed database; the session's memory is used until it has opened (or if it failed)
+        history = self.history_store if self.history_store.available else self.detection_history_memory
+        if flush and history is self.history_store:
+            self.history_store.flush()  # Records of the last second are still queued for the writer
 
-    def create_gallery_item_widget(self, history_record):
-        """Creates a widget for a single history item."""
-        try:
-            record_id = history_record['id']
-            timestamp_dt = history_record['timestamp']
-            timestamp_str = timestamp_dt.strftime("%Y-%m-%d %H:%M:%S")
-            image_path = history_record['image_path']
-            source_type = history_record['source_type']
-            detections = history_record['detected_objects']
-
-            item_frame = QFrame()
-            item_frame.setObjectName("galleryItemFrame") 
-            item_frame.setStyleSheet("background-color: #FFFFFF; border: 1px solid black; ")
-            item_layout = QVBoxLayout(item_frame)
-            item_layout.setContentsMargins(0, 0, 0, 0)
-            item_layout.setSpacing(5) # Space between thumb/labels/button
-
-            # Thumbnail Label
-            thumb_label = QLabel()
-            thumb_label.setObjectName("galleryThumbLabel")
-            thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            thumb_size = 160 # Keep fixed for grid consistency
-
-            if image_path and os.path.exists(image_path):
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(
-                        thumb_size, thumb_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    thumb_label.setPixmap(scaled_pixmap)
-                else:
-                    thumb_label.setText("Invalid Image")
-                    thumb_label.setStyleSheet("color: #BF616A;")
-            elif 'webcam' in source_type:
-                webcam_icon = get_icon(
-                    "webcam_play.svg", QStyle.StandardPixmap.SP_MediaPlay)
-                thumb_label.setPixmap(webcam_icon.pixmap(QSize(64, 64)))
-                thumb_label.setStyleSheet("background-color: #353A4C;")
-            else:
-                thumb_label.setText("No Image")
-                thumb_label.setStyleSheet("color: #A0A7B9;")
-            item_layout.addWidget(thumb_label)
-
-            # Info Labels
-            info_text = "N/A"
-            if detections:
-                primary_class = "Unknown"
-                if detections[0].get('class'):
-                    primary_class_raw = detections[0]['class']
-                    primary_class = primary_class_raw
-                    # Map to standard name
-                    for target_class in self.plastic_classes:
-                        if target_class.lower() in primary_class_raw.lower():
-                            primary_class = target_class
-                            break
-                count = len(detections)
-                info_text = f"{primary_class}" + \
-                    (f" (+{count-1})" if count > 1 else "")
-                # Truncate if too long
-                max_len = 22
-                if len(info_text) > max_len:
-                    info_text = info_text[:max_len-3] + "..."
-            info_label = QLabel(info_text)
-            info_label.setObjectName("galleryInfoLabel")
-            item_layout.addWidget(info_label)
-
-            date_label = QLabel(timestamp_str)
-            date_label.setObjectName("galleryDateLabel")
-            item_layout.addWidget(date_label)
-
-            # Details Button
-            details_btn = QPushButton("View Details")
-            details_btn.setStyleSheet("background-color: #A9A9A9;")
-            details_btn.setObjectName("galleryDetailsButton")
-            details_btn.clicked.connect(
-                lambda checked=False, rec=history_record: self.show_history_details(rec))
-            item_layout.addWidget(details_btn)
-
-            # Calculate fixed height
-            item_height = thumb_size + 65 # Adjust based on label/button heights
-            item_frame.setFixedSize(thumb_size, item_height)
-
-            return item_frame
+        self.thumbnail_loader.cancel_pending()  # Thumbnails of the previous results are no longer needed
+        self.history_model.reset(history, class_name_filter, search_term)
+        self.history_model.fetchMore()  # First screenful now; the view fetches the rest as it scrolls
 
-        except Exception as e:
-            print(f"Error creating gallery item ID {history_record.get('id', 'N/A')}: {e}")
-            # Return an error placeholder widget
-            error_frame = QFrame()
-            error_frame.setObjectName("galleryItemFrame")
-            error_layout = QVBoxLayout(error_frame)
-            error_label = QLabel(f"Error\nID: {history_record.get('id', 'N/A')}")
-            error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            error_label.setStyleSheet(
-                "color: #BF616A; background-color: #1A1D25; border-radius: 8px; padding: 10px;")
-            error_layout.addWidget(error_label)
-            thumb_size = 160; item_height = thumb_size + 65
-            error_frame.setFixedSize(thumb_size, item_height)
-            return error_frame
+        total_items = history.count(class_name_filter, search_term)  # Cached by the store; only new records are counted
+        self.history_count_label.setText(f"{total_items} record{'s' if total_items != 1 else ''}")
+        self.history_empty_label.setText(
+            "No history items match filters." if class_name_filter or search_term else "No history recorded yet.")
+        self.history_empty_label.setVisible(total_items == 0)
+        self.history_list_view.setVisible(total_items > 0)
+
+        # Scroll to top after update
+        self.history_list_view.scrollToTop()
+
+    def visible_history_paths(self):
+        """Image paths of the gallery tiles on screen (and the line below), found from the uniform grid."""
+        view, model = self.history_list_view, self.history_model
+        grid = view.gridSize()
+        first = QModelIndex()
+        for y in range(0, grid.height(), 10):  # The top line may be partly scrolled off
+            first = view.indexAt(QPoint(grid.width() // 2, y))
+            if first.isValid():
+                break
+        if not first.isValid():
+            return set()
+        columns = max(1, view.viewport().width() // grid.width())
+        lines = view.viewport().height() // grid.height() + 2
+        last = min(model.rowCount(), first.row() + lines * columns)
+        return {model.records[row]['image_path'] for row in range(first.row(), last)
+                if model.records[row]['image_path']}
+
+    def gallery_summary(self, detections):
+        """Short text for a gallery tile: the first object's class and how many more there are."""
+        info_text = "N/A"
+        if detections:
+            primary_class = "Unknown"
+            if detections[0].get('class'):
+                # Map to standard name
+                primary_class = self.class_resolver.resolve(detections[0])[0]
+            count = len(detections)
+            info_text = f"{primary_class}" + \
+                (f" (+{count-1})" if count > 1 else "")
+            # Truncate if too long
+            max_len = 22
+            if len(info_text) > max_len:
+                info_text = info_text[:max_len-3] + "..."
+        return info_text
 
     def show_history_details(self, history_record):
         """Shows detailed view of a history item using a MessageBox."""
@@ -2876,25 +4633,30 @@ class WasteDetectionApp(QWidget):
 
         msg_box.exec()
 
-    def history_prev_page(self):
-        if self.current_history_page > 1:
-            self.update_history_view(page=self.current_history_page - 1)
-
-    def history_next_page(self):
-        if self.current_history_page < self.total_history_pages:
-            self.update_history_view(page=self.current_history_page + 1)
-
 
 # --- Main Execution ---
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    # --fast-start (or WASTE_DETECTION_FAST_START=1) skips the intro video
+    fast_start = "--fast-start" in sys.argv or os.environ.get("WASTE_DETECTION_FAST_START", "").lower() in ("1", "true", "yes")
+    app = QApplication([arg for arg in sys.argv if arg != "--fast-start"])
     app.main_window = None
 
     # Track global components
     splash = SplashScreen()
     splash.show()
+    app.processEvents()
+    splash_time = time.time() - LAUNCH_TIME
+    eager_modules = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"Startup: splash shown {splash_time:.2f}s after launch")
+    if splash_time > SPLASH_TIME_BUDGET or eager_modules:
+        print(f"Warning: startup over its import budget ({splash_time:.2f}s, budget {SPLASH_TIME_BUDGET:.1f}s); "
+              f"imported before the splash: {', '.join(eager_modules) or 'no heavy modules'}")
     video_screen = None
-    video_finished = False
+    video_finished = fast_start
+    main_ui_shown = False
+
+    # Model, tracker and webcams start loading now, while the splash/intro video are on screen
+    startup = StartupOrchestrator(resource_path(MODEL_FILE)).start()
 
     def cleanup_video():
         """Stop and clean up video resources."""
@@ -2906,28 +4668,21 @@ if __name__ == "__main__":
         print("Video resources cleaned up")
 
     def start_main_ui():
-        """Launch the main WasteDetectionApp after video."""
-        global splash, video_screen
-        print("Starting main UI...")
+        """Shows the main window once the model is loaded and the intro video is over."""
+        global splash, main_ui_shown
+        if main_ui_shown or not video_finished or not startup.model_done or app.main_window is None:
+            return
+        main_ui_shown = True
+        print(f"Starting main UI ({startup.elapsed():.1f}s after launch)...")
 
         # Ensure video is closed
         cleanup_video()
 
-        try:
-            from rec import WasteDetectionApp
-            app.main_window = WasteDetectionApp()
-            app.main_window.show()
-
-            if splash:
-                splash.finish(app.main_window)
-                splash = None
-
-            print("Main UI loaded successfully")
-        except Exception as e:
-            import traceback
-            print(f"Error loading main UI: {e}")
-            traceback.print_exc()
-            app.quit()
+        app.main_window.show()
+        if splash:
+            splash.finish(app.main_window)
+            splash = None
+        print("Main UI loaded successfully")
 
     def on_video_finished():
         """Handle when intro video ends."""
@@ -2936,6 +4691,8 @@ if __name__ == "__main__":
             print("Video already finished, ignoring duplicate signal")
             return
         video_finished = True
+        if not startup.model_done and splash:
+            splash.show()  # Keep reporting load progress until the model is ready
         print("Video finished, moving to main UI...")
         start_main_ui()
 
@@ -2952,13 +4709,25 @@ if __name__ == "__main__":
                 video_screen.show()
             else:
                 print(f"Video not found: {video_path}, skipping...")
-                start_main_ui()
+                on_video_finished()
         except Exception as e:
             print(f"Error starting video: {e}")
-            start_main_ui()
+            on_video_finished()
+
+    try:
+        # Built while the loaders run; it fills in models and webcams as they arrive
+        app.main_window = WasteDetectionApp(splash=splash, startup=startup)
+    except Exception as e:
+        import traceback
+        print(f"Error loading main UI: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+    startup.model_loaded.connect(lambda model: start_main_ui())
 
-    # Sequence: show splash → wait → start video
     print("Application started. Showing splash...")
-    QTimer.singleShot(3000, start_video)
+    if fast_start:
+        start_main_ui()
+    else:
+        QTimer.singleShot(0, start_video)
 
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
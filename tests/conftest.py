@@ -0,0 +1,5 @@
+import os, sys
+
+# rec.py is a Qt module; the tests only construct non-GUI objects but still need a platform plugin
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
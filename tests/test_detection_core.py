@@ -0,0 +1,49 @@
+"""Qt-free detection helpers."""
+import importlib.util
+
+import numpy as np
+import pytest
+
+from detection_core import DETECTION_DTYPE, env_int, nms_indices
+
+needs_torchvision = pytest.mark.skipif(importlib.util.find_spec("torchvision") is None,
+                                       reason="nms_indices runs torchvision's NMS")
+
+
+def make_detections(rows):
+    detections = np.empty(len(rows), dtype=DETECTION_DTYPE)
+    for i, (box, conf, cls) in enumerate(rows):
+        detections[i] = (box, conf, cls)
+    return detections
+
+
+@needs_torchvision
+def test_nms_suppresses_overlaps_within_a_class():
+    detections = make_detections([
+        ([0, 0, 100, 100], 0.6, 0),
+        ([5, 5, 105, 105], 0.9, 0),  # Overlaps the first one; higher score wins
+        ([5, 5, 105, 105], 0.7, 1),  # Same box, other class: kept
+        ([300, 300, 400, 400], 0.5, 0),
+    ])
+    assert nms_indices(detections, 0.5).tolist() == [1, 2, 3]
+    assert nms_indices(detections, 0.95).tolist() == [1, 2, 0, 3]  # Nothing overlaps that much
+
+
+@needs_torchvision
+def test_nms_keeps_at_most_max_det():
+    detections = make_detections([([i * 200, 0, i * 200 + 100, 100], 0.5 + i / 100, 0) for i in range(5)])
+    assert nms_indices(detections, 0.5, max_det=2).tolist() == [4, 3]
+
+
+@needs_torchvision
+def test_nms_of_no_detections():
+    assert len(nms_indices(np.empty(0, dtype=DETECTION_DTYPE), 0.5)) == 0
+
+
+@pytest.mark.parametrize("value, expected", [(None, 2), ("", 2), (" 4 ", 4), ("0", 0), ("four", 2)])
+def test_env_int_falls_back_to_default(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("WASTE_DETECTION_TEST_INT", raising=False)
+    else:
+        monkeypatch.setenv("WASTE_DETECTION_TEST_INT", value)
+    assert env_int("WASTE_DETECTION_TEST_INT", 2) == expected
@@ -0,0 +1,120 @@
+"""HistoryStore queries checked against the in-memory DetectionHistory filters they replace."""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from rec import DetectionHistory, HistoryStore
+
+CLASSES = ["PET", "HDPE", "PVC", "LDPE", "PP", "PS"]
+FILTERS = [
+    (None, ""),
+    ("pet", ""),
+    ("pp", ""),
+    (None, "batch03"),
+    (None, "pv"),  # Shorter than a trigram: searched without the FTS index
+    (None, "hdpe"),  # Matches class names as well as paths
+    ("ldpe", "img_1"),
+    (None, "no such file"),
+]
+
+
+def make_history(num_records, seed=0, start=datetime(2025, 1, 1)):
+    rng = random.Random(seed)
+    history = DetectionHistory()
+    for i in range(num_records):
+        detections = [{"class": rng.choice(CLASSES), "conf": round(rng.uniform(0.25, 1.0), 4),
+                       "box": [rng.randrange(600), rng.randrange(400), 640, 480]}
+                      for _ in range(rng.randrange(4))]
+        webcam = i % 5 == 0
+        history.append("webcam" if webcam else "image", detections,
+                       image_path=None if webcam else f"/data/batch{i % 7:02d}/img_{i}.jpg",
+                       processing_time_ms=(i % 9) * 0.5, confidence_threshold=0.25, iou_threshold=0.45,
+                       timestamp=start + timedelta(seconds=i // 3))  # Several records share a timestamp
+    return history
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    yield store
+    store.stop()
+
+
+@pytest.fixture
+def conn(store):
+    """The writer connection, used from the test thread in place of run()."""
+    conn = store.open_database()
+    store.available = True
+    yield conn
+    conn.close()
+
+
+def all_pages(history, class_filter, search_term, limit):
+    records, key = history.search(class_filter, search_term, limit=limit)
+    while key is not None:
+        page, key = history.search(class_filter, search_term, after=key, limit=limit)
+        assert page
+        records += page
+    return records
+
+
+@pytest.mark.parametrize("sorted_matches", [True, False])
+@pytest.mark.parametrize("class_filter, search_term", FILTERS)
+def test_search_and_count_match_memory(store, conn, class_filter, search_term, sorted_matches):
+    history = make_history(300)
+    store.write_batch(conn, list(history))
+    if not sorted_matches:
+        store.MAX_SORTED_MATCHES = 0  # Every filter walks the time index instead
+
+    assert store.count(class_filter, search_term) == history.count(class_filter, search_term)
+    expected = all_pages(history, class_filter, search_term, limit=300)
+    assert all_pages(store, class_filter, search_term, limit=7) == expected
+    assert all_pages(history, class_filter, search_term, limit=7) == expected
+
+
+def test_pages_are_newest_first_without_gaps(store, conn):
+    store.write_batch(conn, list(make_history(100)))
+    records = all_pages(store, None, "", limit=9)
+    keys = [(record["timestamp"], record["id"]) for record in records]
+    assert keys == sorted(keys, reverse=True)
+    assert sorted(record["id"] for record in records) == list(range(1, 101))
+
+
+def test_count_cache_counts_only_new_records(store, conn):
+    history = make_history(200)
+    records = list(history)
+    store.write_batch(conn, records[:120])
+    assert store.count("pet", "") == sum(
+        any(det["class"] == "PET" for det in record["detected_objects"]) for record in records[:120])
+    assert store._counts[("pet", "")][1] == 120
+
+    store.write_batch(conn, records[120:])
+    assert store.count("pet", "") == history.count("pet", "")
+    assert store._counts[("pet", "")][1] == 200
+
+
+def test_count_cache_keeps_the_newest_filters(store, conn):
+    store.write_batch(conn, list(make_history(20)))
+    store.COUNT_CACHE_SIZE = 2
+    for term in ("batch01", "batch02", "batch03"):
+        store.count(None, term)
+    assert list(store._counts) == [(None, "batch02"), (None, "batch03")]
+
+
+def test_clear_drops_records_and_cached_counts(store, conn):
+    store.write_batch(conn, list(make_history(50)))
+    assert store.count() == 50
+    store.clear()
+    store.write_batch(conn, [HistoryStore.CLEAR])
+    assert store.count() == 0
+    assert store.search() == ([], None)
+
+
+def test_count_before_a_queued_clear_is_committed_is_not_reused(store, conn):
+    records = list(make_history(60))
+    store.write_batch(conn, records[:50])
+    store.clear()  # Queued for the writer only
+    assert store.count() == 50
+    store.write_batch(conn, [HistoryStore.CLEAR] + records[50:])  # Ids start over below the cached newest id
+    assert store.count() == 10
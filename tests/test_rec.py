@@ -0,0 +1,123 @@
+"""Non-GUI helpers of the desktop app."""
+import os
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from rec import AnalyticsAggregator, DetectionResultCache, FrameBuffer, ThumbnailLoader, reset_strongsort
+
+
+def test_frame_buffer_drops_oldest_when_full():
+    buffer = FrameBuffer(2)
+    for frame in (1, 2, 3):
+        buffer.put(frame)
+    assert [buffer.get(timeout=0), buffer.get(timeout=0), buffer.get(timeout=0)] == [2, 3, None]
+
+
+def test_frame_buffer_blocking_put_waits_for_room():
+    buffer = FrameBuffer(1)
+    buffer.put(1)
+    producer = threading.Thread(target=buffer.put, args=(2,), kwargs={"block": True})
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive()  # Nothing is dropped while the consumer is behind
+    assert buffer.get(timeout=1) == 1
+    producer.join(1)
+    assert buffer.get(timeout=1) == 2
+
+
+def test_frame_buffer_latest_only_returns_newest():
+    buffer = FrameBuffer(3, latest_only=True)
+    for frame in (1, 2, 3):
+        buffer.put(frame)
+    assert buffer.get(timeout=0) == 3
+    assert len(buffer) == 0
+
+
+def test_frame_buffer_close_wakes_consumer():
+    buffer = FrameBuffer(2)
+    buffer.put(1)
+    buffer.close()
+    buffer.put(2)  # Ignored once closed
+    assert buffer.get() == 1
+    assert buffer.get() is None
+
+
+def test_reset_strongsort_forgets_tracks():
+    tracker = SimpleNamespace(tracks=["track"], _next_id=42, metric=SimpleNamespace(samples={7: ["feature"]}))
+    strongsort = SimpleNamespace(tracker=tracker)
+    reset_strongsort(strongsort)
+    assert (tracker.tracks, tracker._next_id, tracker.metric.samples) == ([], 1, {})
+
+
+def test_result_cache_key_changes_with_the_file(tmp_path):
+    image = tmp_path / "a.jpg"
+    image.write_bytes(b"first")
+    key = DetectionResultCache.make_key(str(image), "best.pt")
+    assert key == DetectionResultCache.make_key(str(image), "best.pt")
+    assert key != DetectionResultCache.make_key(str(image), "best.onnx")
+    image.write_bytes(b"edited")
+    assert key != DetectionResultCache.make_key(str(image), "best.pt")
+    assert DetectionResultCache.make_key(str(tmp_path / "missing.jpg"), "best.pt") is None
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = DetectionResultCache(max_entries=2)
+    cache.put("a", "raw a", 1.0)
+    cache.put("b", "raw b", 2.0)
+    assert cache.get("a") == {"raw": "raw a", "processing_time_ms": 1.0}  # Now the most recent
+    cache.put("c", "raw c", 3.0)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert len(cache) == 2
+
+
+def test_result_cache_ignores_missing_keys():
+    cache = DetectionResultCache()
+    cache.put(None, "raw", 1.0)
+    assert len(cache) == 0
+    assert cache.get(None) is None and None not in cache
+
+
+def test_analytics_aggregator_matches_a_full_pass():
+    rng = np.random.default_rng(0)
+    aggregator = AnalyticsAggregator()
+    class_ids, confidences = [], []
+    for _ in range(200):
+        count = int(rng.integers(0, 5))
+        ids = rng.integers(0, 6, count)
+        confs = rng.choice(np.linspace(0, 1, 101), count).astype(np.float32)  # Often exactly on a threshold
+        aggregator.add(ids, confs, processing_time_ms=10.0)
+        class_ids += ids.tolist()
+        confidences += confs.tolist()
+    class_ids, confidences = np.array(class_ids), np.array(confidences, dtype=np.float32)
+
+    for threshold in (0.0, 0.25, 0.5, 0.73, 1.0):
+        kept = confidences >= np.float32(threshold)
+        assert aggregator.class_counts(threshold).tolist() == np.bincount(class_ids[kept], minlength=6).tolist()
+        assert aggregator.confidence_sum(threshold) == pytest.approx(float(confidences[kept].sum()))
+    assert aggregator.confidence_histogram().sum() == len(confidences)
+    assert aggregator.num_records == 200
+    assert aggregator.average_processing_time == 10.0
+
+
+def test_analytics_aggregator_starts_empty():
+    aggregator = AnalyticsAggregator()
+    aggregator.add([], [], processing_time_ms=4.0)
+    assert aggregator.class_counts(0.5).tolist() == []
+    assert aggregator.average_processing_time == 4.0
+
+
+def test_thumbnail_disk_cache_is_pruned_oldest_first(tmp_path):
+    for i in range(5):
+        thumbnail = tmp_path / f"{i}.png"
+        thumbnail.write_bytes(b"x" * 100)
+        os.utime(thumbnail, (i, i))  # Larger i was used more recently
+    loader = ThumbnailLoader(str(tmp_path), max_disk_bytes=250)
+    loader.disk_pool.waitForDone()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["3.png", "4.png"]
+
+    loader.clear()
+    loader.stop()
+    assert list(tmp_path.iterdir()) == []